@@ -0,0 +1,73 @@
+# Translates a synthetic 1M-row patient export with a stub translator and
+# reports throughput, how many distinct values reached the translator, and
+# peak memory. Pass --whole to also time the old read-everything-and-
+# to_string() extraction for comparison (run last, it dominates peak RSS).
+# Run from the repo root: python benchmarks/bench_csv_translation.py [rows] [--whole]
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from csv_translation import iter_translated_csv
+
+DIAGNOSES = ["fever", "cancer", "diabetes", "asthma", "migraine", "hypertension", "fracture", "infection"]
+DEPARTMENTS = ["General Medicine", "Oncology", "Endocrinology", "Pulmonology", "Neurology", "Cardiology", "Orthopedics"]
+NOTES = [f"Follow up in {weeks} weeks, patient reports {symptom}." for weeks in range(1, 26)
+         for symptom in ("mild pain", "fatigue", "no change", "improvement")]
+
+
+def build_csv(path, rows, seed=0):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("patient_id,age,visit_date,diagnosis,department,notes,amount\n")
+        for i in range(rows):
+            f.write(f"P{i:07d},{rng.randint(1, 95)},2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d},"
+                    f"{rng.choice(DIAGNOSES)},{rng.choice(DEPARTMENTS)},\"{rng.choice(NOTES)}\",{rng.uniform(10, 900):.2f}\n")
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    rows = int(args[0]) if args else 1000000
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "export.csv")
+    build_csv(path, rows)
+    print(f"{rows} rows, {os.path.getsize(path) / 1e6:.0f} MB; baseline peak RSS {peak_rss_mb():.0f} MB")
+
+    calls = {"batches": 0, "values": 0}
+
+    def stub_translate_batch(values, source_lang, target_lang):
+        calls["batches"] += 1
+        calls["values"] += len(values)
+        return [value.upper() for value in values]
+
+    def find_keywords(text, lang):
+        return [word for word in DIAGNOSES if word == text]
+
+    def localize(keywords, translated_text, lang):
+        return [{"english": keyword, "term": translated_text} for keyword in keywords]
+
+    start = time.perf_counter()
+    with open(path, "rb") as source, open(os.path.join(directory, "export.es.csv"), "w", encoding="utf-8") as out:
+        for csv_text, _ in iter_translated_csv(source, "en", "es", stub_translate_batch, find_keywords, localize):
+            out.write(csv_text)
+    elapsed = time.perf_counter() - start
+    print(f"chunked: {elapsed:.1f} s ({rows / elapsed:,.0f} rows/s), {calls['values']} distinct values "
+          f"in {calls['batches']} batches, peak RSS {peak_rss_mb():.0f} MB")
+
+    if "--whole" in sys.argv:
+        import pandas as pd
+        start = time.perf_counter()
+        text = pd.read_csv(path).to_string()
+        print(f"whole file to_string: {time.perf_counter() - start:.1f} s, {len(text) / 1e6:.0f} MB of text to translate, "
+              f"peak RSS {peak_rss_mb():.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
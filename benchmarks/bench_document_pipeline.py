@@ -0,0 +1,66 @@
+# Compares translating a 50-page synthetic lab report in one call against the
+# segmented, deduplicated and batched pipeline.
+#
+# By default the translator is a stub whose cost is proportional to input
+# length and which releases the GIL while "decoding", like CTranslate2.
+# Pass --argos to use the installed Argos en->es model instead.
+# Run from the repo root: python benchmarks/bench_document_pipeline.py
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from document_pipeline import translate_document, make_batch_translator
+
+PAGES = 50
+STUB_SECONDS_PER_CHAR = 20e-6
+
+
+def synthetic_report(pages, rng):
+    header = "City General Hospital - Department of Pathology\nLaboratory Report\n"
+    footer = "This report is confidential. Results should be interpreted by a physician.\n"
+    tests = ["Hemoglobin", "White blood cells", "Platelets", "Glucose", "Creatinine", "Sodium", "Potassium"]
+    notes = ["Patient reports mild fever and headache.", "No signs of infection were observed.",
+             "Follow up with cardiology in two weeks.", "Continue current medication for hypertension."]
+    out = []
+    for page in range(1, pages + 1):
+        out.append(header)
+        for test in tests:
+            out.append(f"{test}: {rng.uniform(1, 200):.1f}\n")
+        out.append(" ".join(rng.sample(notes, 2)) + "\n")
+        out.append("--- [Image Content] ---\nHospital seal. Signed by the attending physician.\n--- [End Image Content] ---\n")
+        out.append(footer)
+        out.append(f"Page {page} of {pages}\n\n")
+    return "".join(out)
+
+
+def stub_translate(text, source_lang, target_lang):
+    time.sleep(len(text) * STUB_SECONDS_PER_CHAR)
+    return text[::-1]
+
+
+def main():
+    translate_fn = stub_translate
+    if "--argos" in sys.argv:
+        import argostranslate.translate
+        translate_fn = argostranslate.translate.translate
+    report = synthetic_report(PAGES, random.Random(7))
+    print(f"report: {PAGES} pages, {len(report)} chars")
+
+    start = time.perf_counter()
+    translate_fn(report, "en", "es")
+    single = time.perf_counter() - start
+    print(f"single call:            {single:8.2f} s")
+
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        batch = make_batch_translator(translate_fn, workers)
+        start = time.perf_counter()
+        _, stats = translate_document(report, "en", "es", batch, batch_size=32)
+        elapsed = time.perf_counter() - start
+        print(f"pipeline, {workers:>2} workers:   {elapsed:8.2f} s  ({single / elapsed:5.1f}x, "
+              f"{stats['unique_segments']}/{stats['segments']} unique segments)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# Drives every endpoint with a synthetic corpus (TXT, CSV, DOCX and PDF files
+# of increasing size, plus text, batch and hospital requests) and reports
+# p50/p95 latency and throughput per case.
+#
+# Everything runs offline: the translator and Gemini OCR are stubs with a
+# fixed cost (per character / per image), and Overpass and OSRM are the
+# local map stand-in. Caches stay on, so numbers are steady-state; pass
+# --cold to bypass the translation and OCR caches on every request.
+#
+# Save a run with --save FILE and check a later one with --compare FILE: any
+# case whose p95 grew by more than --threshold (default 20%) is reported and
+# the script exits with status 1.
+# Run from the repo root: python benchmarks/bench_endpoints.py [--requests 20] [--concurrency 4]
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import map_standin
+
+TRANSLATE_SECONDS_PER_CHAR = 20e-6
+OCR_SECONDS = 0.05
+MAP_LATENCY = 0.02
+SENTENCES = [
+    "Patient reports fever and headache since Monday.", "No signs of infection were observed.",
+    "Blood pressure is 130 over 85.", "Follow up with cardiology in two weeks.",
+    "Continue current medication for hypertension.", "Mild cough, chest x-ray is clear.",
+    "Refer to oncology for biopsy results.", "Hemoglobin 13.2 g/dL, platelets normal.",
+]
+
+
+# --- Stub services ---
+class StubTranslation:
+    def __init__(self, to_code):
+        self.to_code = to_code
+
+    def translate(self, text):
+        time.sleep(len(text) * TRANSLATE_SECONDS_PER_CHAR)
+        return f"[{self.to_code}] {text}"
+
+
+class StubLanguage:
+    def __init__(self, code):
+        self.code = code
+        self.name = code.upper()
+
+    def get_translation(self, other):
+        return StubTranslation(other.code)
+
+
+class StubVisionModel:
+    def generate_content(self, parts):
+        time.sleep(OCR_SECONDS)
+        return type("StubResponse", (), {"text": "Prescription: paracetamol 500 mg for fever."})()
+
+
+def install_stubs(app, cold):
+    codes = ["en", "es", "hi", "bn", "fr"]
+    app.translator_registry._installed = [StubLanguage(code) for code in codes]
+    app.get_installed_package_versions = lambda: {(a, b): "1.0" for a in codes for b in codes if "en" in (a, b) and a != b}
+    app._vision_model = StubVisionModel()
+    if cold:
+        app.translation_cache.get_or_translate = lambda text, s, t, translate_fn: translate_fn(text, s, t)
+        app.ocr_cache.get = lambda image_bytes: None
+
+
+# --- Synthetic corpus ---
+def text_body(lines, rng):
+    return "".join(rng.choice(SENTENCES) + "\n" for _ in range(lines))
+
+
+def make_txt(lines, rng):
+    return text_body(lines, rng).encode("utf-8")
+
+
+def make_csv(rows, rng):
+    out = ["patient_id,age,diagnosis,department,notes\n"]
+    for i in range(rows):
+        out.append(f"P{i:06d},{rng.randint(1, 95)},{rng.choice(['fever', 'asthma', 'fracture', 'migraine'])},"
+                   f"{rng.choice(['Cardiology', 'Neurology', 'Oncology'])},\"{rng.choice(SENTENCES)}\"\n")
+    return "".join(out).encode("utf-8")
+
+
+def make_docx(paragraphs, rng):
+    import docx
+    document = docx.Document()
+    for _ in range(paragraphs):
+        document.add_paragraph(rng.choice(SENTENCES))
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def make_pdf(pages, rng):
+    import fitz
+    from PIL import Image
+    logo = io.BytesIO()
+    Image.effect_noise((96, 96), 64).convert("RGB").save(logo, "PNG")
+    with fitz.open() as doc:
+        for page_number in range(pages):
+            page = doc.new_page()
+            page.insert_text((72, 72), " ".join(rng.sample(SENTENCES, 3)))
+            page.insert_image(fitz.Rect(400, 20, 496, 116), stream=logo.getvalue())
+            if page_number % 5 == 0:
+                scan = io.BytesIO()
+                Image.effect_noise((160, 160), 40 + page_number).convert("RGB").save(scan, "PNG")
+                page.insert_image(fitz.Rect(72, 200, 232, 360), stream=scan.getvalue())
+        return doc.tobytes()
+
+
+def build_cases(rng):
+    """(name, request function taking a test client) for every endpoint and corpus size."""
+    cases = [
+        ("GET /healthz", lambda c: c.get("/healthz")),
+        ("GET /api/languages", lambda c: c.get("/api/languages")),
+        ("POST /api/translate", lambda c: c.post("/api/translate", json={
+            "text": " ".join(rng.sample(SENTENCES, 2)), "source_lang": "en", "target_lang": "es"})),
+        ("POST /api/translate-batch 20x3", lambda c: c.post("/api/translate-batch", json={
+            "texts": rng.sample(SENTENCES, 8) * 2 + rng.sample(SENTENCES, 4), "source_lang": "en", "target_langs": ["es", "hi", "fr"]})),
+        ("POST /api/nearby-hospitals-osm", lambda c: c.post("/api/nearby-hospitals-osm", json={
+            "lat": 28.6 + rng.uniform(-0.02, 0.02), "lon": 77.2 + rng.uniform(-0.02, 0.02)})),
+    ]
+    files = [("txt", make_txt, (20, 200, 2000)), ("csv", make_csv, (100, 1000, 10000)),
+             ("docx", make_docx, (20, 200, 1000)), ("pdf", make_pdf, (1, 10, 40))]
+    for extension, make, sizes in files:
+        for size in sizes:
+            payload = make(size, rng)
+            name = f"file.{extension}"
+            cases.append((f"POST /api/translate-file {extension} x{size}", lambda c, p=payload, n=name: c.post(
+                "/api/translate-file", data={"target_lang": "es", "file": (io.BytesIO(p), n)})))
+        cases.append((f"POST /api/translate-file/stream {extension} x{sizes[1]}", lambda c, p=make(sizes[1], rng), n=name: c.post(
+            "/api/translate-file/stream", data={"target_lang": "es", "file": (io.BytesIO(p), n)})))
+    job_payload = make_pdf(10, rng)
+    cases.append(("POST+poll /api/jobs pdf x10", lambda c: run_job(c, job_payload)))
+    cases.append(("GET /metrics", lambda c: c.get("/metrics")))
+    return cases
+
+
+def run_job(client, payload):
+    response = client.post("/api/jobs", data={"target_lang": "es", "file": (io.BytesIO(payload), "job.pdf")})
+    status_url = response.get_json()["status_url"]
+    while True:
+        response = client.get(status_url)
+        if response.get_json()["status"] in ("done", "failed", "cancelled"):
+            return response
+        time.sleep(0.01)
+
+
+# --- Driver ---
+def run_case(app, request_fn, requests, concurrency):
+    local = threading.local()
+
+    def one(_):
+        if not hasattr(local, "client"):
+            local.client = app.app.test_client()
+        start = time.perf_counter()
+        response = request_fn(local.client)
+        response.get_data()  # drain streamed bodies
+        if response.status_code >= 400:
+            raise RuntimeError(f"status {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return time.perf_counter() - start
+
+    one(None)  # warm-up: model loads, first-touch caches
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        timings = sorted(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "p50_ms": statistics.median(timings) * 1000,
+        "p95_ms": timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))] * 1000,
+        "throughput_rps": requests / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--cold", action="store_true")
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--save")
+    parser.add_argument("--compare")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = map_standin.start(latency=MAP_LATENCY)
+    base = f"http://127.0.0.1:{server.server_port}"
+    os.environ["OVERPASS_URL"] = f"{base}/api/interpreter"
+    os.environ["OSRM_URL"] = base
+    os.chdir(tempfile.mkdtemp())
+    import app
+    install_stubs(app, args.cold)
+    app.create_app()  # starts the job workers
+
+    results = {}
+    print(f"{'case':<48} {'p50 ms':>9} {'p95 ms':>9} {'req/s':>8}")
+    for name, request_fn in build_cases(random.Random(0)):
+        if args.only and args.only not in name:
+            continue
+        result = results[name] = run_case(app, request_fn, args.requests, args.concurrency)
+        print(f"{name:<48} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['throughput_rps']:>8.1f}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = [(name, baseline[name]["p95_ms"], result["p95_ms"]) for name, result in results.items()
+                       if name in baseline and result["p95_ms"] > baseline[name]["p95_ms"] * (1 + args.threshold)]
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p95 {before:.1f} ms -> {after:.1f} ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Compares the old per-term regex scan with GlossaryMatcher as the glossary grows.
+# Run from the repo root: python benchmarks/bench_glossary_matcher.py
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from glossary_index import GlossaryMatcher
+
+SIZES = [100, 1000, 10000, 20000]
+LEGACY_MAX_SIZE = 1000  # the regex loop gets too slow to be worth timing beyond this
+REPEATS = 5
+
+
+def legacy_find_medical_keywords(glossary, text, source_lang):
+    found_keywords = []
+    lower_text = text.lower()
+    for english_term, translations in glossary.items():
+        if source_lang in translations:
+            terms_to_find = translations[source_lang]
+            if not isinstance(terms_to_find, list):
+                terms_to_find = [terms_to_find]
+            for term in terms_to_find:
+                pattern = r'\b' + r'\s*'.join(re.escape(word) for word in term.lower().split()) + r'\b'
+                if re.search(pattern, lower_text):
+                    found_keywords.append(english_term)
+                    break
+    return list(set(found_keywords))
+
+
+def synthetic_glossary(size, rng):
+    glossary = {}
+    while len(glossary) < size:
+        words = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 10)))
+                 for _ in range(rng.randint(1, 3))]
+        term = " ".join(words)
+        glossary[term] = {"en": term, "es": term + "o"}
+    return glossary
+
+
+def synthetic_text(glossary, rng, words=20000):
+    terms = list(glossary)
+    filler = ["the", "patient", "reports", "mild", "symptoms", "since", "monday", "and", "was", "given"]
+    out = []
+    while len(out) < words:
+        out.append(rng.choice(terms) if rng.random() < 0.02 else rng.choice(filler))
+    return " ".join(out)
+
+
+def best_of(fn):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    rng = random.Random(42)
+    base = synthetic_glossary(max(SIZES), rng)
+    text = synthetic_text(dict(list(base.items())[:SIZES[0]]), rng)
+    print(f"text: {len(text)} chars")
+    print(f"{'terms':>8} {'build (ms)':>12} {'index (ms)':>12} {'legacy (ms)':>12}")
+    for size in SIZES:
+        glossary = dict(list(base.items())[:size])
+        start = time.perf_counter()
+        matcher = GlossaryMatcher(glossary, "en")
+        build = time.perf_counter() - start
+        find_concepts = lambda: list(dict.fromkeys(hit.english for hit in matcher.find_all(text)))
+        indexed = best_of(find_concepts)
+        legacy = "-"
+        if size <= LEGACY_MAX_SIZE:
+            expected = set(legacy_find_medical_keywords(glossary, text, "en"))
+            assert set(find_concepts()) == expected
+            legacy = f"{best_of(lambda: legacy_find_medical_keywords(glossary, text, 'en')) * 1000:.1f}"
+        print(f"{size:>8} {build * 1000:>12.1f} {indexed * 1000:>12.1f} {legacy:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Times radius and k-nearest queries on the hospital index at 100k facilities
+# against a linear scan, and the bulk load of a GeoJSON extract of that size.
+# Run from the repo root: python benchmarks/bench_hospital_index.py [facilities]
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hospital_index import HospitalIndex
+from hospital_routing import haversine_m
+
+QUERIES = 2000
+RADIUS_M = 10000
+K = 10
+
+
+def build_extract(path, count, seed=0):
+    # Facilities scattered over roughly the Indian subcontinent.
+    rng = random.Random(seed)
+    features = [{"type": "Feature", "id": i, "properties": {"name": f"Hospital {i}"},
+                 "geometry": {"type": "Point", "coordinates": [rng.uniform(68, 97), rng.uniform(8, 35)]}}
+                for i in range(count)]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f)
+
+
+def per_query_us(fn, points):
+    start = time.perf_counter()
+    for lat, lon in points:
+        fn(lat, lon)
+    return (time.perf_counter() - start) / len(points) * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    path = os.path.join(tempfile.mkdtemp(), "hospitals.geojson")
+    build_extract(path, count)
+
+    index = HospitalIndex()
+    start = time.perf_counter()
+    loaded = index.load_geojson(path)
+    print(f"loaded {loaded} facilities in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rng = random.Random(1)
+    points = [(rng.uniform(8, 35), rng.uniform(68, 97)) for _ in range(QUERIES)]
+    hospitals = [h for cell in index._cells.values() for h in cell.values()]
+
+    def scan_nearest(lat, lon):
+        return sorted(hospitals, key=lambda h: haversine_m(lat, lon, h['lat'], h['lon']))[:K]
+
+    for lat, lon in points[:50]:
+        expected = [h['id'] for h in scan_nearest(lat, lon) if haversine_m(lat, lon, h['lat'], h['lon']) <= RADIUS_M]
+        assert [h['id'] for h in index.nearest(lat, lon, K, RADIUS_M)] == expected
+
+    radius_us = per_query_us(lambda lat, lon: index.within_radius(lat, lon, RADIUS_M), points)
+    nearest_us = per_query_us(lambda lat, lon: index.nearest(lat, lon, K, RADIUS_M), points)
+    wide_us = per_query_us(lambda lat, lon: index.nearest(lat, lon, K, 100000), points)
+    scan_us = per_query_us(scan_nearest, points[:20])
+    print(f"radius {RADIUS_M / 1000:g} km: {radius_us:.1f} us/query")
+    print(f"{K}-nearest within {RADIUS_M / 1000:g} km: {nearest_us:.1f} us/query")
+    print(f"{K}-nearest within 100 km: {wide_us:.1f} us/query")
+    print(f"linear scan {K}-nearest: {scan_us:.0f} us/query ({scan_us / nearest_us:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# Times /api/nearby-hospitals-osm against the local map stand-in with a fixed
+# per-call latency, and reports how many upstream calls each request makes.
+# Run from the repo root: python benchmarks/bench_nearby_hospitals.py [latency_s]
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import map_standin
+
+REQUESTS = 10
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+    server = map_standin.start(latency=latency)
+    base = f"http://127.0.0.1:{server.server_port}"
+    os.environ["OVERPASS_URL"] = f"{base}/api/interpreter"
+    os.environ["OSRM_URL"] = base
+    os.chdir(tempfile.mkdtemp())
+    import app
+
+    client = app.app.test_client()
+    timings = []
+    for i in range(REQUESTS):
+        start = time.perf_counter()
+        response = client.post("/api/nearby-hospitals-osm", json={"lat": 28.61 + i * 0.001, "lon": 77.21})
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.json
+    results = response.json
+    ordered = all(a["distance"] <= b["distance"] for a, b in zip(results, results[1:]))
+    print(f"upstream latency {latency * 1000:.0f} ms: median {statistics.median(timings) * 1000:.0f} ms, "
+          f"max {max(timings) * 1000:.0f} ms per request")
+    print("upstream calls per request: " + ", ".join(f"{name} {count / REQUESTS:g}" for name, count in map_standin.MapStandIn.calls.items()))
+    print(f"{len(results)} results, nearest first: {ordered}, with geometry: {sum(1 for r in results if r.get('geometry'))}")
+
+
+if __name__ == "__main__":
+    main()
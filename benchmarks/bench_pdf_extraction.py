@@ -0,0 +1,77 @@
+# Compares the old serial PDF walk (one OCR call per image occurrence) with
+# iter_pdf_pages on a synthetic PDF where every page repeats a logo and a
+# stamp and has one unique image. OCR is a stub with a fixed round-trip delay,
+# so this runs offline.
+# Run from the repo root: python benchmarks/bench_pdf_extraction.py
+import os
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_extraction import iter_pdf_pages, format_image_block
+
+PAGES = 30
+OCR_LATENCY = 0.05
+ocr_calls = 0
+
+
+def stub_ocr(image_bytes):
+    global ocr_calls
+    ocr_calls += 1
+    time.sleep(OCR_LATENCY)
+    return f"image of {len(image_bytes)} bytes"
+
+
+def solid_png(color, size=64):
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, size, size), False)
+    pixmap.set_rect(pixmap.irect, color)
+    return pixmap.tobytes("png")
+
+
+def build_pdf(path):
+    logo, stamp = solid_png((200, 0, 0)), solid_png((0, 0, 200))
+    with fitz.open() as doc:
+        for page_number in range(PAGES):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"Lab report page {page_number + 1}. Hemoglobin 13.2 g/dL.")
+            page.insert_image(fitz.Rect(400, 20, 460, 80), stream=logo)
+            page.insert_image(fitz.Rect(400, 700, 460, 760), stream=stamp)
+            page.insert_image(fitz.Rect(72, 200, 200, 328), stream=solid_png((page_number, 120, 60)))
+        doc.save(path)
+
+
+def serial_extract(path):
+    pages = []
+    with fitz.open(path) as doc:
+        for page in doc:
+            text = page.get_text()
+            for img in page.get_images(full=True):
+                text += format_image_block(stub_ocr(doc.extract_image(img[0])["image"]))
+            pages.append(text)
+    return pages
+
+
+def main():
+    global ocr_calls
+    path = os.path.join(tempfile.mkdtemp(), "synthetic.pdf")
+    build_pdf(path)
+
+    ocr_calls = 0
+    start = time.perf_counter()
+    expected = serial_extract(path)
+    print(f"serial:      {time.perf_counter() - start:6.2f} s, {ocr_calls} OCR calls")
+
+    for processes, inflight in ((1, 1), (1, 4), (os.cpu_count() or 1, 8)):
+        ocr_calls = 0
+        start = time.perf_counter()
+        pages = list(iter_pdf_pages(path, stub_ocr, processes=processes, max_inflight_ocr=inflight))
+        elapsed = time.perf_counter() - start
+        assert pages == expected
+        print(f"pipelined:   {elapsed:6.2f} s, {ocr_calls} OCR calls ({processes} processes, {inflight} in flight)")
+
+
+if __name__ == "__main__":
+    main()
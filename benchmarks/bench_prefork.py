@@ -0,0 +1,194 @@
+# Load-tests the preforking launcher (gunicorn.conf.py) with 1, 2, 4... workers
+# up to the core count: throughput and p50/p95 latency of /api/translate, and
+# the memory of the master and each worker (RSS, PSS and private USS, from
+# /proc/<pid>/smaps_rollup). Pages loaded in the master and shared
+# copy-on-write count fully in every RSS but are split between processes in PSS.
+#
+# Runs offline: the translator is a stub that spends a fixed amount of CPU
+# (holding the GIL, like the Python side of a request) and the translation
+# cache is bypassed. A synthetic hospital extract is loaded in the master so
+# the shared data is large enough to see. Needs gunicorn (Linux).
+# Run from the repo root: python benchmarks/bench_prefork.py [--workers 1,2,4] [--seconds 10] [--clients 8]
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TRANSLATE_CPU_SECONDS = 0.002
+HOSPITALS = 200000
+PORT = 5091
+SENTENCES = [
+    "Patient reports fever and headache since Monday.", "Follow up with cardiology in two weeks.",
+    "Continue current medication for hypertension.", "Mild cough, chest x-ray is clear.",
+]
+
+
+# --- Server side (imported by gunicorn in the master) ---
+class StubTranslation:
+    def __init__(self, to_code):
+        self.to_code = to_code
+
+    def translate(self, text):
+        deadline = time.thread_time() + TRANSLATE_CPU_SECONDS
+        while time.thread_time() < deadline:
+            pass
+        return f"[{self.to_code}] {text}"
+
+
+class StubLanguage:
+    def __init__(self, code):
+        self.code = code
+        self.name = code.upper()
+
+    def get_translation(self, other):
+        return StubTranslation(other.code)
+
+
+def stub_app():
+    """gunicorn target: app.py with the stub translator and no translation cache."""
+    import app
+    codes = ["en", "es", "hi"]
+    app.translator_registry._installed = [StubLanguage(code) for code in codes]
+    app.get_installed_package_versions = lambda: {(a, b): "1.0" for a in codes for b in codes if "en" in (a, b) and a != b}
+    app.translation_cache.get_or_translate = lambda text, s, t, translate_fn: translate_fn(text, s, t)
+    return app.create_app(preforked=True)
+
+
+# --- Driver ---
+def write_extract(path, count, seed=0):
+    rng = random.Random(seed)
+    features = [{"type": "Feature", "properties": {"name": f"Hospital {i}", "amenity": "hospital"},
+                 "geometry": {"type": "Point", "coordinates": [77.0 + rng.uniform(-1, 1), 28.5 + rng.uniform(-1, 1)]}}
+                for i in range(count)]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f)
+
+
+def memory_kb(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return {"rss": values["Rss"], "pss": values["Pss"],
+            "uss": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)}
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def client(seconds, seed, results):
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=60)
+    timings = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        body = json.dumps({"text": rng.choice(SENTENCES), "source_lang": "en", "target_lang": "es"})
+        start = time.perf_counter()
+        connection.request("POST", "/api/translate", body, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        if response.status == 200:
+            timings.append(time.perf_counter() - start)
+        if response.getheader("Connection", "").lower() == "close":
+            connection.close()
+            connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=60)
+    results.put(timings)
+
+
+def wait_ready(process, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", PORT, timeout=1)
+            connection.request("GET", "/healthz")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("gunicorn did not become ready")
+
+
+def run(workers, threads, seconds, clients, extract, workdir):
+    env = dict(os.environ, WEB_WORKERS=str(workers), WEB_THREADS=str(threads), WEB_MAX_REQUESTS="0",
+               WEB_BIND=f"127.0.0.1:{PORT}", HOSPITAL_EXTRACT_PATH=extract, TRANSLATION_QUEUE_SIZE="1000")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", os.path.join(REPO, "gunicorn.conf.py"),
+         "--pythonpath", f"{REPO},{BENCH_DIR}", "bench_prefork:stub_app()"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(process)
+        # Let every worker load its lazily created state before measuring.
+        warm = multiprocessing.Queue()
+        client(1.0, -1, warm)
+        warm.get()
+
+        results = multiprocessing.Queue()
+        start = time.perf_counter()
+        procs = [multiprocessing.Process(target=client, args=(seconds, seed, results)) for seed in range(clients)]
+        for proc in procs:
+            proc.start()
+        timings = sorted(t for _ in procs for t in results.get())
+        elapsed = time.perf_counter() - start
+        for proc in procs:
+            proc.join()
+
+        master = memory_kb(process.pid)
+        worker_memory = [memory_kb(pid) for pid in children(process.pid)]
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+    return {
+        "workers": workers,
+        "throughput_rps": len(timings) / elapsed,
+        "p50_ms": statistics.median(timings) * 1000,
+        "p95_ms": timings[int(0.95 * (len(timings) - 1))] * 1000,
+        "master_rss_mb": master["rss"] / 1024,
+        "worker_rss_mb": statistics.mean(m["rss"] for m in worker_memory) / 1024,
+        "worker_pss_mb": statistics.mean(m["pss"] for m in worker_memory) / 1024,
+        "worker_uss_mb": statistics.mean(m["uss"] for m in worker_memory) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, 2} | {2 ** i for i in range(cores.bit_length()) if 2 ** i <= cores})
+    parser.add_argument("--workers", default=",".join(map(str, default_workers)))
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=max(8, 2 * cores))
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    extract = os.path.join(workdir, "hospitals.geojson")
+    write_extract(extract, HOSPITALS)
+    print(f"{cores} cores, {args.threads} threads per worker, {args.clients} clients, "
+          f"{TRANSLATE_CPU_SECONDS * 1000:.0f} ms CPU per translation, {HOSPITALS} hospitals preloaded")
+    print(f"{'workers':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'master RSS':>11} "
+          f"{'worker RSS':>11} {'worker PSS':>11} {'worker USS':>11}")
+    for workers in [int(w) for w in args.workers.split(",")]:
+        r = run(workers, args.threads, args.seconds, args.clients, extract, workdir)
+        print(f"{r['workers']:>7} {r['throughput_rps']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+              f"{r['master_rss_mb']:>8.1f} MB {r['worker_rss_mb']:>8.1f} MB {r['worker_pss_mb']:>8.1f} MB "
+              f"{r['worker_uss_mb']:>8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# Measures cold import time of app.py in fresh interpreters and checks that
+# heavy libraries are not imported at startup.
+# Run from the repo root: python benchmarks/bench_startup.py [runs]
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["argostranslate", "ctranslate2", "pandas", "fitz", "docx", "PIL.Image", "google.generativeai"]
+
+PROBE = f"""
+import json, sys, time
+sys.path.insert(0, {REPO!r})
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    timings = []
+    loaded = set()
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(runs):
+            output = subprocess.run([sys.executable, "-c", PROBE], cwd=workdir, capture_output=True, text=True, check=True)
+            result = json.loads(output.stdout.strip().splitlines()[-1])
+            timings.append(result["seconds"])
+            loaded.update(result["loaded"])
+    print(f"import app: median {statistics.median(timings) * 1000:.0f} ms, "
+          f"min {min(timings) * 1000:.0f} ms over {runs} runs")
+    print(f"heavy modules imported at startup: {', '.join(sorted(loaded)) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
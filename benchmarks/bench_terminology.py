@@ -0,0 +1,154 @@
+# Compares the terminology store (compiled, memory-mapped index) with holding
+# the same terminology as in-process dicts plus a GlossaryMatcher per language:
+# compile time, load time and resident memory of a fresh process, and lookup
+# latency. Then, as a preforking server runs it, loads every language before
+# forking WORKERS workers and reports the memory each worker does not share
+# with the others after serving lookups. Each measurement runs in its own
+# interpreter.
+# Run from the repo root: python benchmarks/bench_terminology.py [concepts]
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LANGS = ["en", "es", "hi", "de", "fr"]
+WORKERS = 4
+TEXT = ("Patient presents with fever and persistent headache, history of hypertension. "
+        "Referred for an x-ray and a ct scan; rule out pneumonia. ") * 20
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {repo!r})
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+before = rss_mb()
+start = time.perf_counter()
+if {mode!r} == "store":
+    from terminology import TerminologyStore
+    store = TerminologyStore({source!r}, {index!r})
+    find = lambda: store.find_concepts({text!r}, "en")
+    locate = lambda concepts: store.locate_terms({text!r}, "es", concepts)
+    recommend = lambda concepts: store.recommendations(concepts, "es")
+else:
+    from glossary_index import GlossaryMatcher
+    with open({source!r}, encoding="utf-8") as f:
+        data = json.load(f)
+    matchers = {{lang: GlossaryMatcher(data["concepts"], lang) for lang in ("en", "es")}}
+    find = lambda: list(dict.fromkeys(hit.english for hit in matchers["en"].find_all({text!r})))
+    locate = lambda concepts: {{hit.english: hit.surface for hit in reversed(matchers["es"].find_all({text!r}, True, set(concepts)))}}
+    recommend = lambda concepts: [d for c in concepts for d in data["symptom_departments"].get(c, [])]
+load_seconds = time.perf_counter() - start
+concepts = find()
+start = time.perf_counter()
+for _ in range(200):
+    concepts = find()
+    locate(concepts)
+    recommend(concepts)
+lookup_ms = (time.perf_counter() - start) / 200 * 1000
+print(json.dumps({{"load_seconds": load_seconds, "rss_mb": rss_mb() - before, "lookup_ms": lookup_ms, "found": len(concepts)}}))
+"""
+
+FORKED_PROBE = """
+import gc, json, os, sys
+sys.path.insert(0, {repo!r})
+def private_mb():
+    with open("/proc/self/smaps_rollup") as f:
+        return sum(int(line.split()[1]) for line in f if line.startswith(("Private_Clean:", "Private_Dirty:"))) / 1024
+if {mode!r} == "store":
+    from terminology import TerminologyStore
+    store = TerminologyStore({source!r}, {index!r})
+    store.preload()
+    def serve(lang):
+        concepts = store.find_concepts({text!r}, lang)
+        store.locate_terms({text!r}, lang, concepts)
+        store.recommendations(concepts, lang)
+    langs = store.languages()
+else:
+    from glossary_index import GlossaryMatcher
+    with open({source!r}, encoding="utf-8") as f:
+        data = json.load(f)
+    langs = sorted({{lang for translations in data["concepts"].values() for lang in translations}})
+    matchers = {{lang: GlossaryMatcher(data["concepts"], lang) for lang in langs}}
+    def serve(lang):
+        concepts = list(dict.fromkeys(hit.english for hit in matchers[lang].find_all({text!r})))
+        matchers[lang].find_all({text!r}, True, set(concepts))
+        [d for c in concepts for d in data["symptom_departments"].get(c, [])]
+gc.collect()
+gc.freeze()
+pipes = []
+for _ in range({workers}):
+    read_end, write_end = os.pipe()
+    if os.fork() == 0:
+        for _ in range(50):
+            for lang in langs:
+                serve(lang)
+        gc.collect()
+        os.write(write_end, json.dumps(private_mb()).encode())
+        os._exit(0)
+    os.close(write_end)
+    pipes.append(read_end)
+private = [json.loads(os.read(read_end, 64)) for read_end in pipes]
+for _ in pipes:
+    os.wait()
+print(json.dumps({{"private_mb": sum(private) / len(private)}}))
+"""
+
+
+def build_source(path, concepts, seed=0):
+    rng = random.Random(seed)
+    base = json.load(open(os.path.join(REPO, "data", "terminology.json"), encoding="utf-8"))
+    syllables = ["ca", "ro", "te", "mi", "lo", "na", "su", "pe", "di", "ga", "vo", "ki"]
+    data = {"format": base["format"], "revision": "bench", "concepts": dict(base["concepts"]),
+            "departments": base["departments"], "symptom_departments": dict(base["symptom_departments"])}
+    departments = list(base["departments"])
+    while len(data["concepts"]) < concepts:
+        words = ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 5))) for _ in range(rng.randint(1, 3))]
+        english = " ".join(words)
+        data["concepts"][english] = {lang: f"{english} {lang}" if lang != "en" else english for lang in LANGS}
+        if rng.random() < 0.3:
+            data["symptom_departments"][english] = rng.sample(departments, 2)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def probe(mode, source, index):
+    code = PROBE.format(repo=REPO, mode=mode, source=source, index=index, text=TEXT)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def forked_probe(mode, source, index):
+    code = FORKED_PROBE.format(repo=REPO, mode=mode, source=source, index=index, text=TEXT, workers=WORKERS)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    concepts = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    directory = tempfile.mkdtemp()
+    source = os.path.join(directory, "terminology.json")
+    index = os.path.join(directory, "terminology.sqlite3")
+    build_source(source, concepts)
+    print(f"{concepts} concepts x {len(LANGS)} languages = {concepts * len(LANGS)} terms, "
+          f"source {os.path.getsize(source) / 1e6:.1f} MB")
+
+    cold = probe("store", source, index)  # first load compiles the index
+    print(f"store, compile on first load: {cold['load_seconds']:.2f} s, index {os.path.getsize(index) / 1e6:.1f} MB")
+    for mode in ("store", "dicts"):
+        result = probe(mode, source, index)
+        print(f"{mode:>6}: load {result['load_seconds'] * 1000:8.1f} ms, RSS +{result['rss_mb']:6.1f} MB, "
+              f"detect+localize+recommend {result['lookup_ms']:.2f} ms ({result['found']} concepts)")
+    print(f"preloaded before fork, every language, {WORKERS} workers:")
+    for mode in ("store", "dicts"):
+        result = forked_probe(mode, source, index)
+        print(f"{mode:>6}: {result['private_mb']:6.1f} MB private per worker")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Translates a synthetic corpus of templated clinical documents (lab reports
+# with varying values, discharge sheets with varying drugs, doses and dates)
+# through the translation memory and reports the reuse rate, the model calls
+# saved against an exact-text cache, and the lookup overhead per sentence.
+#
+# The translator is a deterministic stub that handles each word independently:
+# glossary terms become their Spanish term, capitalized words and values are
+# copied, and other words are reversed. So a reused translation must equal
+# the one the stub would have produced, and any difference is reported.
+# Run from the repo root: python benchmarks/bench_translation_memory.py [documents]
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from terminology import TerminologyStore
+from translation_memory import TranslationMemory
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SYMPTOMS = ["fever", "cough", "headache", "nausea", "fatigue", "dizziness"]
+DRUGS = ["Metformin", "Lisinopril", "Atorvastatin", "Amlodipine", "Omeprazole", "Losartan"]
+LAB_TEMPLATE = [
+    "Patient presents with {symptom} since {date}.",
+    "Hemoglobin {hb} g/dL, platelets {plt} per microliter.",
+    "Blood pressure {sys} over {dia} mmHg.",
+    "Follow up in {weeks} weeks.",
+]
+DISCHARGE_TEMPLATE = [
+    "Discharged on {date} in stable condition.",
+    "Take {drug} {dose} mg twice daily for {days} days.",
+    "Continue {drug2} {dose2} mg every morning.",
+    "Return immediately if {symptom} gets worse.",
+    "Dr. {doctor} reviewed the {note} notes.",
+]
+NOTES = ["admission", "nursing", "radiology", "pharmacy", "surgical", "dietary", "therapy", "consult"]
+
+
+def make_document(rng):
+    values = {
+        "symptom": rng.choice(SYMPTOMS), "date": f"{rng.randint(2020, 2026)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "hb": f"{rng.uniform(9, 16):.1f}", "plt": rng.randint(120, 420), "sys": rng.randint(100, 170),
+        "dia": rng.randint(60, 100), "weeks": rng.randint(2, 12), "drug": rng.choice(DRUGS), "drug2": rng.choice(DRUGS),
+        "dose": rng.choice([5, 10, 20, 40, 500, 850]), "dose2": rng.choice([5, 10, 20, 40]), "days": rng.randint(5, 30),
+        "doctor": rng.choice(["Sharma", "Garcia", "Okafor", "Chen"]), "note": rng.choice(NOTES),
+    }
+    template = LAB_TEMPLATE if rng.random() < 0.5 else DISCHARGE_TEMPLATE
+    return " ".join(sentence.format(**values) for sentence in template)
+
+
+def make_stub(terminology, calls):
+    def translate(segment, source_lang, target_lang):
+        calls.append(segment)
+        located = terminology.locate_terms(segment, source_lang, terminology.find_concepts(segment, source_lang))
+        terms = {surface: terminology.terms(english, target_lang)[0] for english, surface in located.items()}
+        pattern = "|".join([rf"(?<!\w){re.escape(surface)}(?!\w)" for surface in terms] + [r"\b[a-z]{2,}\b"])
+        return re.sub(pattern, lambda match: terms.get(match.group(0), match.group(0)[::-1]), segment)
+    return translate
+
+
+def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(0)
+    corpus = [make_document(rng) for _ in range(documents)]
+    directory = tempfile.mkdtemp()
+    terminology = TerminologyStore(os.path.join(REPO, "data", "terminology.json"), os.path.join(directory, "terminology.sqlite3"))
+    reference = make_stub(terminology, [])
+    sentences = [sentence for document in corpus for sentence in re.split(r"(?<=[.!?])\s+", document)]
+
+    for fuzzy in (False, True):
+        calls = []
+        memory = TranslationMemory(os.path.join(directory, f"tm-{fuzzy}.sqlite3"), terminology=terminology, fuzzy=fuzzy)
+        stub = make_stub(terminology, calls)
+        batches = []
+        translate = lambda segments, s, t: batches.append(segments) or [stub(segment, s, t) for segment in segments]
+        mismatches = 0
+        start = time.perf_counter()
+        for document in corpus:
+            translated = memory.translate(document, "en", "es", translate)
+            if translated != " ".join(reference(s, "en", "es") for s in re.split(r"(?<=[.!?])\s+", document)):
+                mismatches += 1
+        elapsed = time.perf_counter() - start
+        stats = memory.stats()
+        label = "templates + near-duplicates" if fuzzy else "templates only"
+        print(f"{label}: reuse rate {stats['reuse_rate']:.1%} ({stats['exact_hits']} template, {stats['near_hits']} near), "
+              f"{len(calls)} sentences to the model in {len(batches)} calls vs {len(set(sentences))} with an exact-text cache ({len(sentences)} sentences), "
+              f"{stats['entries']} entries, {elapsed / len(sentences) * 1e6:.0f} us per sentence, {mismatches} mismatched documents")
+
+
+if __name__ == "__main__":
+    main()
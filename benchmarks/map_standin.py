@@ -0,0 +1,119 @@
+# Local stand-in for the Overpass and OSRM APIs, for testing and benchmarking
+# /api/nearby-hospitals-osm offline. Point the app at it with
+#   OVERPASS_URL=http://127.0.0.1:8089/api/interpreter OSRM_URL=http://127.0.0.1:8089
+#
+# Overpass answers replay overpass.json from --fixtures DIR when given,
+# otherwise synthetic hospitals scattered around the query point or inside
+# the query bounding box. OSRM table
+# and route answers are computed from straight-line distance.
+# Run: python benchmarks/map_standin.py [--port 8089] [--latency 0.1] [--fixtures DIR]
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hospital_routing import haversine_m
+
+ROAD_FACTOR = 1.3
+SPEED_M_S = 11.0
+
+
+def synthetic_overpass(lat, lon, count=40, seed=0, half_lat=0.08, half_lon=None):
+    rng = random.Random(seed)
+    if half_lon is None:
+        half_lon = half_lat / max(math.cos(math.radians(lat)), 0.1)
+    elements = []
+    for i in range(count):
+        h_lat = lat + rng.uniform(-half_lat, half_lat)
+        h_lon = lon + rng.uniform(-half_lon, half_lon)
+        if i % 3 == 0:
+            elements.append({"type": "way", "id": 1000 + i, "center": {"lat": h_lat, "lon": h_lon}, "tags": {"name": f"Hospital {i}"}})
+        else:
+            elements.append({"type": "node", "id": 1000 + i, "lat": h_lat, "lon": h_lon, "tags": {"name": f"Hospital {i}"}})
+    return {"elements": elements}
+
+
+def parse_coords(path_part):
+    return [tuple(float(v) for v in pair.split(",")) for pair in unquote(path_part).split(";")]
+
+
+class MapStandIn(BaseHTTPRequestHandler):
+    latency = 0.0
+    fixtures = None
+    calls = {"overpass": 0, "table": 0, "route": 0}
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, payload):
+        time.sleep(self.latency)
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _count(self, name):
+        with self.lock:
+            self.calls[name] += 1
+
+    def do_POST(self):
+        query = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+        self._count("overpass")
+        if self.fixtures:
+            with open(os.path.join(self.fixtures, "overpass.json"), encoding="utf-8") as f:
+                return self._send(json.load(f))
+        bbox = re.search(r"\(([-\d.]+),([-\d.]+),([-\d.]+),([-\d.]+)\)", query)
+        if bbox:
+            south, west, north, east = (float(v) for v in bbox.groups())
+            return self._send(synthetic_overpass((south + north) / 2, (west + east) / 2,
+                                                 half_lat=(north - south) / 2, half_lon=(east - west) / 2))
+        match = re.search(r"around:\d+,([-\d.]+),([-\d.]+)", query)
+        lat, lon = (float(match.group(1)), float(match.group(2))) if match else (0.0, 0.0)
+        self._send(synthetic_overpass(lat, lon))
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path.startswith("/table/v1/driving/"):
+            self._count("table")
+            coords = parse_coords(path[len("/table/v1/driving/"):])
+            (lon0, lat0) = coords[0]
+            distances = [haversine_m(lat0, lon0, lat, lon) * ROAD_FACTOR for lon, lat in coords]
+            return self._send({"code": "Ok", "distances": [distances], "durations": [[d / SPEED_M_S for d in distances]]})
+        if path.startswith("/route/v1/driving/"):
+            self._count("route")
+            (lon0, lat0), (lon1, lat1) = parse_coords(path[len("/route/v1/driving/"):])
+            distance = haversine_m(lat0, lon0, lat1, lon1) * ROAD_FACTOR
+            geometry = {"type": "LineString", "coordinates": [[lon0, lat0], [lon1, lat0], [lon1, lat1]]}
+            return self._send({"code": "Ok", "routes": [{"distance": distance, "duration": distance / SPEED_M_S, "geometry": geometry}]})
+        self.send_error(404)
+
+
+def start(port=0, latency=0.0, fixtures=None):
+    """Starts the stand-in on a background thread and returns the server (see server.server_port)."""
+    MapStandIn.latency = latency
+    MapStandIn.fixtures = fixtures
+    server = ThreadingHTTPServer(("127.0.0.1", port), MapStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fixtures")
+    args = parser.parse_args()
+    server = start(args.port, args.latency, args.fixtures)
+    print(f"Map stand-in listening on http://127.0.0.1:{server.server_port}")
+    threading.Event().wait()
@@ -0,0 +1,76 @@
+import io
+import re
+from collections import OrderedDict
+
+_WORD_RE = re.compile(r"[^\W\d_]{2,}")
+_CODE_RE = re.compile(r"^\S*\d\S*$")
+
+
+def has_words(value):
+    """
+    Whether a cell holds words worth translating: not blank, a number, a date
+    or a single-token code such as P0012345 or ICD-10.
+    """
+    return bool(_WORD_RE.search(value)) and not _CODE_RE.match(value)
+
+
+def iter_translated_csv(stream, source_lang, target_lang, translate_batch, find_keywords, localize_keywords,
+                        chunk_rows=500, memo_size=100000):
+    """
+    Translates a CSV file chunk by chunk and yields (csv_text, keywords_data)
+    per chunk; the csv_text pieces concatenate to a CSV with the original
+    header, rows and columns. Cells are read as strings, so numbers and codes
+    are written back exactly as they came in.
+
+    Only cells containing words are translated, so numeric, date and ID
+    cells are left untouched wherever they appear; a column whose first rows
+    hold only codes still has its later free text translated. Each distinct
+    cell value is translated once per file (through
+    `translate_batch(values, source_lang, target_lang)`, one call per chunk)
+    and remembered in an LRU of `memo_size` values, which together with
+    `chunk_rows` bounds memory. Glossary keywords are detected once per
+    distinct value; each keyword in keywords_data lists the `columns` it
+    appeared in within the chunk.
+    """
+    import pandas as pd
+
+    memo = OrderedDict()   # cell value -> (translated value, localized keywords)
+    first = True
+    for chunk in pd.read_csv(stream, chunksize=chunk_rows, dtype=str, keep_default_na=False):
+        distinct_by_column = {}
+        for column in chunk.columns:
+            distinct = chunk[column].unique()
+            # One search over the whole chunk lets numeric, date and ID columns skip the per-cell check.
+            if not _WORD_RE.search('\n'.join(distinct)):
+                continue
+            values = [value for value in distinct if has_words(value)]
+            if values:
+                distinct_by_column[column] = values
+
+        pending = list(dict.fromkeys(value for values in distinct_by_column.values()
+                                     for value in values if value not in memo))
+        if pending:
+            translated = translate_batch(pending, source_lang, target_lang)
+            for value, translated_value in zip(pending, translated):
+                keywords = find_keywords(value, source_lang)
+                memo[value] = (translated_value, localize_keywords(keywords, translated_value, target_lang) if keywords else [])
+
+        chunk_translations = {}
+        keywords_by_english = {}
+        for column, values in distinct_by_column.items():
+            for value in values:
+                memo.move_to_end(value)
+                translated_value, keywords = memo[value]
+                chunk_translations[value] = translated_value
+                for keyword in keywords:
+                    entry = keywords_by_english.setdefault(keyword['english'], dict(keyword, columns=[]))
+                    if column not in entry['columns']:
+                        entry['columns'].append(column)
+            chunk[column] = chunk[column].map(lambda value: chunk_translations.get(value, value))
+        while len(memo) > memo_size:
+            memo.popitem(last=False)
+
+        buffer = io.StringIO()
+        chunk.to_csv(buffer, index=False, header=first)
+        first = False
+        yield buffer.getvalue(), list(keywords_by_english.values())
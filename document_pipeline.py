@@ -0,0 +1,81 @@
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+IMAGE_MARKERS = ("--- [Image Content] ---", "--- [End Image Content] ---")
+
+_LINE_RE = re.compile(r"[^\n]*\n|[^\n]+")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])(\s+)")
+# Lines with nothing to translate: blank, page numbers, rulers, bare values.
+_UNTRANSLATABLE_RE = re.compile(r"^[\W\d_]*$")
+
+
+def segment_document(text):
+    """
+    Splits a document into (piece, translatable) tuples whose concatenation is
+    the original text. Translatable pieces are single sentences with no
+    surrounding whitespace; everything else (line breaks, indentation, image
+    markers, numbers) is passed through untouched.
+    """
+    pieces = []
+    for line in _LINE_RE.findall(text):
+        body = line.strip()
+        if not body or body in IMAGE_MARKERS or _UNTRANSLATABLE_RE.match(body):
+            pieces.append((line, False))
+            continue
+        lead = line[:len(line) - len(line.lstrip())]
+        trail = line[len(line.rstrip()):]
+        if lead:
+            pieces.append((lead, False))
+        for i, part in enumerate(_SENTENCE_SPLIT_RE.split(body)):
+            if part:
+                # split() with a capture group alternates sentence, separator.
+                pieces.append((part, i % 2 == 0))
+        if trail:
+            pieces.append((trail, False))
+    return pieces
+
+
+def translate_document(text, source_lang, target_lang, translate_batch, batch_size=32):
+    """
+    Translates a long document segment by segment. Identical segments (page
+    headers, footers, repeated boilerplate) are translated once, and unique
+    segments are handed to translate_batch(segments, source_lang, target_lang)
+    in groups of batch_size. Returns the reassembled text and the segment counts.
+    """
+    pieces = segment_document(text)
+    unique_segments = list(dict.fromkeys(piece for piece, translatable in pieces if translatable))
+    translations = {}
+    for start in range(0, len(unique_segments), batch_size):
+        batch = unique_segments[start:start + batch_size]
+        translations.update(zip(batch, translate_batch(batch, source_lang, target_lang)))
+    translated_text = "".join(translations[piece] if translatable else piece for piece, translatable in pieces)
+    stats = {
+        "segments": sum(1 for _, translatable in pieces if translatable),
+        "unique_segments": len(unique_segments),
+    }
+    return translated_text, stats
+
+
+def make_batch_translator(translate_fn, max_workers):
+    """
+    Wraps a single-text translate_fn into a batch function that runs the batch
+    across a thread pool. CTranslate2 releases the GIL while decoding, so the
+    threads use separate cores.
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translate-batch")
+
+    def translate_batch(segments, source_lang, target_lang):
+        # Each task runs in a copy of the caller's context (e.g. its request timings).
+        futures = [executor.submit(contextvars.copy_context().run, translate_fn, segment, source_lang, target_lang)
+                   for segment in segments]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            # The batch has failed: drop the segments that have not started so
+            # they do not hold translator slots. Running ones finish on their own.
+            for future in futures:
+                future.cancel()
+            raise
+
+    return translate_batch
@@ -0,0 +1,98 @@
+import re
+from collections import namedtuple
+
+# Word characters plus the combining marks used by Indic and Arabic scripts,
+# which Python's \w does not cover (without them "बुखार" splits into 3 tokens).
+_TOKEN_RE = re.compile(r"[\w\u0300-\u036f\u0610-\u061a\u064b-\u065f\u0900-\u0dff]+|[^\w\s]")
+
+GlossaryHit = namedtuple("GlossaryHit", ["start", "end", "english", "surface"])
+
+
+def tokenize(text):
+    """
+    Splits text into (token, start, end) tuples. Tokens are lowercased, offsets
+    point into the original text.
+    """
+    return [(m.group(0).lower(), m.start(), m.end()) for m in _TOKEN_RE.finditer(text)]
+
+
+def glossary_terms(glossary, lang):
+    """Yields (english concept, term) for every `lang` term of a glossary dict; a concept may have several."""
+    for english_term, translations in glossary.items():
+        terms = translations.get(lang)
+        if not terms:
+            continue
+        if not isinstance(terms, list):
+            terms = [terms]
+        for term in terms:
+            yield english_term, term
+
+
+class GlossaryMatcher:
+    """
+    Finds every glossary term of one language in a single pass over the text.
+
+    Terms are stored in a hash table keyed by their token tuple, so each text
+    position costs at most `max_term_tokens` lookups no matter how many terms
+    the glossary holds.
+    """
+
+    def __init__(self, glossary, lang):
+        self._index(lang, ((english_term, tuple(token for token, _, _ in tokenize(term)))
+                           for english_term, term in glossary_terms(glossary, lang)))
+
+    @classmethod
+    def from_keys(cls, lang, keyed_terms):
+        """Builds a matcher from (english concept, term token tuple) pairs."""
+        matcher = cls.__new__(cls)
+        matcher._index(lang, keyed_terms)
+        return matcher
+
+    def _index(self, lang, keyed_terms):
+        self.lang = lang
+        self._terms = {}  # token tuple -> list of english concepts
+        self._first_tokens = set()
+        self.max_term_tokens = 0
+        for english_term, key in keyed_terms:
+            if not key:
+                continue
+            concepts = self._terms.setdefault(key, [])
+            if english_term not in concepts:
+                concepts.append(english_term)
+            self._first_tokens.add(key[0])
+            self.max_term_tokens = max(self.max_term_tokens, len(key))
+
+    def __len__(self):
+        return len(self._terms)
+
+    def find_all(self, text, allow_suffix=False, wanted=None):
+        """
+        Returns a GlossaryHit for every term occurrence, in text order.
+        With allow_suffix the last word of a term may carry an inflection
+        suffix ("fractura" matches "fracturas"), and `surface` is the full word.
+        With `wanted` (a set of english concepts) only their terms are matched.
+        """
+        tokens = tokenize(text)
+        hits = []
+        for i, (first, start, _) in enumerate(tokens):
+            if first not in self._first_tokens and not allow_suffix:
+                continue
+            limit = min(self.max_term_tokens, len(tokens) - i)
+            for n in range(1, limit + 1):
+                head = tuple(token for token, _, _ in tokens[i:i + n - 1])
+                if n > 1 and head[0] not in self._first_tokens:
+                    break
+                last, _, end = tokens[i + n - 1]
+                candidates = [last]
+                if allow_suffix:
+                    candidates += [last[:k] for k in range(len(last) - 1, 0, -1)]
+                for candidate in candidates:
+                    concepts = self._terms.get(head + (candidate,))
+                    if concepts and wanted is not None:
+                        concepts = [english for english in concepts if english in wanted]
+                    if concepts:
+                        for english in concepts:
+                            hits.append(GlossaryHit(start, end, english, text[start:end]))
+                        break
+        return hits
+
@@ -0,0 +1,40 @@
+# Production launcher: a preforking gunicorn server (Linux/macOS).
+#   gunicorn -c gunicorn.conf.py
+#
+# The master imports app.py and calls create_app() once, loading configuration,
+# terminology, the hospital extract and shared libraries before it forks, so
+# workers share those pages copy-on-write. Each worker then starts its own
+# threads (ensure_started) and is recycled after WEB_MAX_REQUESTS requests.
+# Translation models load in the workers, not the master (see create_app).
+# `kill -HUP <master pid>` replaces all workers gracefully.
+import os
+
+wsgi_app = "app:create_app(preforked=True)"
+preload_app = True
+
+bind = os.environ.get("WEB_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_WORKERS", os.cpu_count() or 1))
+worker_class = "gthread"
+threads = int(os.environ.get("WEB_THREADS", 4))
+# Recycle each worker after this many requests (0 disables), spread by the jitter
+# so workers do not all restart at once.
+max_requests = int(os.environ.get("WEB_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.environ.get("WEB_MAX_REQUESTS_JITTER", max_requests // 10))
+# Seconds a stopping worker gets to finish its requests and hand back running jobs.
+graceful_timeout = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", 30))
+timeout = int(os.environ.get("WEB_TIMEOUT", 120))
+
+# Split the CPUs between workers unless the pools are sized explicitly; app.py
+# reads these when the master imports it, after this file.
+os.environ.setdefault("TRANSLATION_WORKERS", str(max(1, (os.cpu_count() or 1) // workers)))
+os.environ.setdefault("PDF_EXTRACT_PROCESSES", str(max(1, (os.cpu_count() or 1) // workers)))
+
+
+def post_fork(server, worker):
+    import app
+    app.ensure_started()
+
+
+def worker_exit(server, worker):
+    import app
+    app.shutdown_worker(server.cfg.graceful_timeout)
@@ -0,0 +1,188 @@
+import json
+import math
+import threading
+import time
+
+from hospital_routing import haversine_m
+
+METRES_PER_DEGREE_LAT = 111320.0
+
+
+class HospitalIndex:
+    """
+    In-memory grid index of hospitals for radius and k-nearest queries, which
+    doubles as a tile cache in front of Overpass.
+
+    The world is cut into square tiles of `tile_deg` degrees. A tile is warm
+    once its hospitals have been fetched (valid for `ttl` seconds) or loaded
+    from an offline extract (never expires). Queries only go to Overpass for
+    the cold tiles they touch, with one bounding-box request for all of them.
+    """
+
+    def __init__(self, tile_deg=0.1, ttl=24 * 3600):
+        self.tile_deg = tile_deg
+        self.ttl = ttl
+        self._cells = {}       # tile -> {hospital id: hospital}
+        self._loaded_at = {}   # tile -> fetch time, or None for offline data
+        self._lock = threading.Lock()
+        self._tile_locks = {}  # tile -> lock held while that tile is being fetched
+        self.tile_hits = 0
+        self.tile_misses = 0
+
+    def __len__(self):
+        return sum(len(cell) for cell in self._cells.values())
+
+    def _tile(self, lat, lon):
+        return (math.floor(lat / self.tile_deg), math.floor(lon / self.tile_deg))
+
+    def _tiles_around(self, lat, lon, radius_m):
+        dlat = radius_m / METRES_PER_DEGREE_LAT
+        dlon = radius_m / (METRES_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+        south, west = self._tile(lat - dlat, lon - dlon)
+        north, east = self._tile(lat + dlat, lon + dlon)
+        return [(ty, tx) for ty in range(south, north + 1) for tx in range(west, east + 1)]
+
+    def _tile_bbox(self, tiles):
+        """(south, west, north, east) in degrees covering all tiles."""
+        return (min(ty for ty, _ in tiles) * self.tile_deg, min(tx for _, tx in tiles) * self.tile_deg,
+                (max(ty for ty, _ in tiles) + 1) * self.tile_deg, (max(tx for _, tx in tiles) + 1) * self.tile_deg)
+
+    def add(self, hospitals, tiles=None, permanent=False):
+        """
+        Indexes hospitals (dicts with id, name, lat, lon). When `tiles` is
+        given, those tiles are replaced wholesale and marked warm.
+        """
+        now = None if permanent else time.time()
+        with self._lock:
+            for tile in tiles or ():
+                self._cells[tile] = {}
+                self._loaded_at[tile] = now
+            for hospital in hospitals:
+                tile = self._tile(hospital['lat'], hospital['lon'])
+                self._cells.setdefault(tile, {})[hospital['id']] = {
+                    "id": hospital['id'], "name": hospital['name'], "lat": hospital['lat'], "lon": hospital['lon'],
+                }
+
+    def load_geojson(self, path, coverage=None):
+        """
+        Bulk-loads an offline extract: a GeoJSON FeatureCollection of hospital
+        points (polygons use their vertex average). Returns the count.
+
+        Tiles become permanently warm only where the extract is known to be
+        complete: the tiles lying wholly inside `coverage` (south, west, north,
+        east), or the collection's own `bbox` member, when either is given;
+        otherwise just the tiles that hold a feature. Everything else stays
+        cold and is still fetched from Overpass.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            collection = json.load(f)
+        hospitals = []
+        for i, feature in enumerate(collection.get('features', [])):
+            geometry = feature.get('geometry') or {}
+            coords = geometry.get('coordinates')
+            if geometry.get('type') == 'Point':
+                lon, lat = coords[:2]
+            elif geometry.get('type') == 'Polygon' and coords:
+                ring = coords[0]
+                lon = sum(point[0] for point in ring) / len(ring)
+                lat = sum(point[1] for point in ring) / len(ring)
+            else:
+                continue
+            properties = feature.get('properties') or {}
+            hospitals.append({"id": properties.get('id', feature.get('id', i)),
+                              "name": properties.get('name', 'Unnamed Hospital'), "lat": lat, "lon": lon})
+        if coverage is None and len(collection.get('bbox') or ()) == 4:
+            west, south, east, north = collection['bbox']
+            coverage = (south, west, north, east)
+        if coverage is not None:
+            # Rounded first so that e.g. 77.3 / 0.1 counts as the edge 773, not 772.99...
+            south, west, north, east = (round(value / self.tile_deg, 6) for value in coverage)
+            tiles = [(ty, tx) for ty in range(math.ceil(south), math.floor(north))
+                     for tx in range(math.ceil(west), math.floor(east))]
+        else:
+            tiles = {self._tile(h['lat'], h['lon']) for h in hospitals}
+        self.add(hospitals, tiles=tiles, permanent=True)
+        return len(hospitals)
+
+    def _cold_tiles(self, tiles):
+        now = time.time()
+        with self._lock:
+            return [tile for tile in tiles if tile not in self._loaded_at
+                    or (self._loaded_at[tile] is not None and now - self._loaded_at[tile] > self.ttl)]
+
+    def ensure_area(self, lat, lon, radius_m, fetch_bbox):
+        """
+        Makes sure every tile within radius_m of (lat, lon) is warm, calling
+        fetch_bbox(south, west, north, east) -> hospitals once for the cold ones.
+
+        Concurrent requests for the same cold tile wait for one fetch; requests
+        for other tiles do not wait. Tile locks are taken in sorted order so
+        overlapping requests cannot deadlock.
+        """
+        tiles = self._tiles_around(lat, lon, radius_m)
+        cold = self._cold_tiles(tiles)
+        if not cold:
+            self.tile_hits += 1
+            return
+        with self._lock:
+            locks = [self._tile_locks.setdefault(tile, threading.Lock()) for tile in sorted(cold)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            # Another request may have fetched them while we waited.
+            cold = self._cold_tiles(cold)
+            if not cold:
+                self.tile_hits += 1
+                return
+            self.tile_misses += 1
+            self.add(fetch_bbox(*self._tile_bbox(cold)), tiles=cold)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def within_radius(self, lat, lon, radius_m):
+        """Hospitals within radius_m, nearest first, as fresh dicts with `air_distance`."""
+        found = []
+        with self._lock:
+            for tile in self._tiles_around(lat, lon, radius_m):
+                for hospital in self._cells.get(tile, {}).values():
+                    distance = haversine_m(lat, lon, hospital['lat'], hospital['lon'])
+                    if distance <= radius_m:
+                        found.append(dict(hospital, air_distance=distance))
+        found.sort(key=lambda h: h['air_distance'])
+        return found
+
+    def nearest(self, lat, lon, k, max_radius_m):
+        """
+        The k hospitals nearest to (lat, lon) within max_radius_m. Searches
+        rings of tiles outward and stops once the ring is farther away than
+        the k-th hit.
+        """
+        center_y, center_x = self._tile(lat, lon)
+        tile_m = self.tile_deg * METRES_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01)
+        max_ring = int(max_radius_m / tile_m) + 1
+        found = []
+        with self._lock:
+            for ring in range(max_ring + 1):
+                for ty in range(center_y - ring, center_y + ring + 1):
+                    for tx in range(center_x - ring, center_x + ring + 1):
+                        if max(abs(ty - center_y), abs(tx - center_x)) != ring:
+                            continue
+                        for hospital in self._cells.get((ty, tx), {}).values():
+                            distance = haversine_m(lat, lon, hospital['lat'], hospital['lon'])
+                            if distance <= max_radius_m:
+                                found.append((distance, hospital))
+                # Anything in the next ring is at least `ring` whole tiles away.
+                if len(found) >= k and sorted(d for d, _ in found)[k - 1] <= ring * tile_m:
+                    break
+        found.sort(key=lambda item: item[0])
+        return [dict(hospital, air_distance=distance) for distance, hospital in found[:k]]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hospitals": sum(len(cell) for cell in self._cells.values()),
+                "warm_tiles": len(self._loaded_at),
+                "tile_hits": self.tile_hits,
+                "tile_misses": self.tile_misses,
+            }
@@ -0,0 +1,91 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+EARTH_RADIUS_M = 6371000.0
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in metres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def parse_overpass_hospitals(hospital_data):
+    hospitals = []
+    for element in hospital_data.get('elements', []):
+        tags = element.get('tags', {})
+        name = tags.get('name', 'Unnamed Hospital')
+        if element['type'] == 'node':
+            h_lat, h_lon = element.get('lat'), element.get('lon')
+        else:
+            center = element.get('center', {})
+            h_lat, h_lon = center.get('lat'), center.get('lon')
+        if h_lat and h_lon:
+            hospitals.append({"id": element['id'], "name": name, "lat": h_lat, "lon": h_lon})
+    return hospitals
+
+
+def make_session(pool_size):
+    """A requests session whose connection pool is large enough for concurrent calls."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class OsrmClient:
+    """
+    Fetches driving durations and distances from OSRM in one `table` request
+    and route geometries concurrently, over a pooled session with per-call
+    timeouts.
+    """
+
+    def __init__(self, base_url, timeout, max_workers, session=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = session or make_session(max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="osrm")
+
+    def table(self, lat, lon, hospitals):
+        """Returns [(duration_s, distance_m)] from (lat, lon) to each hospital; None where unroutable."""
+        coords = ";".join([f"{lon},{lat}"] + [f"{h['lon']},{h['lat']}" for h in hospitals])
+        url = f"{self.base_url}/table/v1/driving/{coords}"
+        response = self.session.get(url, params={"sources": "0", "annotations": "duration,distance"}, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        if data.get('code') != 'Ok':
+            raise requests.exceptions.RequestException(f"OSRM table error: {data.get('code')}")
+        try:
+            durations = data['durations'][0][1:]
+            distances = data['distances'][0][1:]
+        except (KeyError, IndexError, TypeError):
+            raise requests.exceptions.RequestException("OSRM table response has no durations or distances")
+        return [None if duration is None or distance is None else (duration, distance)
+                for duration, distance in zip(durations, distances)]
+
+    def route_geometry(self, lat, lon, hospital):
+        coords = f"{lon},{lat};{hospital['lon']},{hospital['lat']}"
+        url = f"{self.base_url}/route/v1/driving/{coords}"
+        response = self.session.get(url, params={"overview": "full", "geometries": "geojson"}, timeout=self.timeout)
+        response.raise_for_status()
+        route_data = response.json()
+        if route_data['code'] == 'Ok' and route_data.get('routes'):
+            return route_data['routes'][0].get('geometry')
+        return None
+
+    def route_geometries(self, lat, lon, hospitals):
+        """Geometries for each hospital, fetched concurrently; None where a call failed."""
+        def fetch(hospital):
+            try:
+                return self.route_geometry(lat, lon, hospital)
+            except requests.exceptions.RequestException as e:
+                print(f"OSRM API Error for {hospital['name']}: {e}")
+                return None
+        return list(self._executor.map(fetch, hospitals))
@@ -1,8 +1,35 @@
 # install_all_languages.py (Corrected Version)
 import argostranslate.package
 import argostranslate.translate
+import sys
 import time
 
+# The languages the app is set up for by default.
+DEFAULT_LANGUAGES = ["en", "es", "hi", "bn", "ur", "el"]
+
+def install_languages(lang_codes):
+    """
+    Installs the to-English and from-English packages for each language code.
+    Other pairs are translated by pivoting through English.
+    """
+    print("Checking for language model updates...")
+    argostranslate.package.update_package_index()
+    available_packages = argostranslate.package.get_available_packages()
+    installed_pairs = {(pkg.from_code, pkg.to_code) for pkg in argostranslate.package.get_installed_packages()}
+    for lang_code in lang_codes:
+        if lang_code == "en":
+            continue
+        for from_code, to_code in ((lang_code, "en"), ("en", lang_code)):
+            if (from_code, to_code) in installed_pairs:
+                print(f"Language package already installed: {from_code} -> {to_code}")
+                continue
+            package_to_install = next(filter(lambda x: x.from_code == from_code and x.to_code == to_code, available_packages), None)
+            if package_to_install:
+                print(f"Downloading and installing language package: {from_code} -> {to_code}")
+                package_to_install.install()
+            else:
+                print(f"Could not find package for: {from_code} -> {to_code}")
+
 def install_all():
     print("Updating package index...")
     argostranslate.package.update_package_index()
@@ -34,4 +61,12 @@ def install_all():
     print("\nInstallation of all available language models is complete!")
 
 if __name__ == "__main__":
-    install_all()
\ No newline at end of file
+    # python install_all_languages.py              -> every available package
+    # python install_all_languages.py --defaults   -> the app's default languages
+    # python install_all_languages.py es hi        -> just these languages
+    if "--defaults" in sys.argv[1:]:
+        install_languages(DEFAULT_LANGUAGES)
+    elif sys.argv[1:]:
+        install_languages(sys.argv[1:])
+    else:
+        install_all()
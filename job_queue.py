@@ -0,0 +1,338 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobStore:
+    """
+    SQLite-backed record of background jobs: state, progress, result and error.
+    Finished jobs are dropped after `ttl` seconds, and the oldest results are
+    dropped first once stored results exceed `max_result_bytes`.
+
+    A running job holds a lease of `lease` seconds, renewed by every update
+    and by heartbeat(). A job whose lease lapses was claimed by a process
+    that died without releasing it (e.g. a killed worker); the next claim
+    puts it back in the queue.
+    """
+
+    def __init__(self, db_path, ttl, max_result_bytes, lease=60.0):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_result_bytes = max_result_bytes
+        self.lease = lease
+        self._lock = threading.Lock()
+        self._inherited_db = None
+        self._db = self._connect()
+
+    def _connect(self):
+        directory = os.path.dirname(self.db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(self.db_path, check_same_thread=False)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT, priority INTEGER, params TEXT, "
+            "progress_done INTEGER DEFAULT 0, progress_total INTEGER, "
+            "result TEXT, result_bytes INTEGER DEFAULT 0, error TEXT, "
+            "cancel_requested INTEGER DEFAULT 0, created_at REAL, updated_at REAL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, priority, created_at)")
+        db.commit()
+        return db
+
+    def reopen(self):
+        """Opens a new connection in a forked worker; the inherited one is left to the parent."""
+        db = self._connect()
+        with self._lock:
+            self._inherited_db, self._db = self._db, db
+
+    def _execute(self, sql, args=()):
+        with self._lock:
+            cursor = self._db.execute(sql, args)
+            self._db.commit()
+            return cursor
+
+    def create(self, params, priority):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, status, priority, params, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, JOB_QUEUED, priority, json.dumps(params), now, now),
+        )
+        return job_id
+
+    def get(self, job_id):
+        """The job, or None if it does not exist or finished more than `ttl` seconds ago."""
+        placeholders = ", ".join("?" for _ in FINISHED_STATES)
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT * FROM jobs WHERE id = ? AND NOT (status IN ({placeholders}) AND updated_at < ?)",
+                (job_id, *FINISHED_STATES, time.time() - self.ttl),
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def update(self, job_id, **fields):
+        if "result" in fields:
+            result = json.dumps(fields["result"])
+            fields["result"] = result
+            fields["result_bytes"] = len(result.encode("utf-8"))
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        self._execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def request_cancel(self, job_id):
+        self._execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+
+    def is_cancel_requested(self, job_id):
+        with self._lock:
+            row = self._db.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row is None or bool(row[0])
+
+    def transition(self, job_id, from_status, to_status):
+        """Moves a job from one status to another if it is still in from_status; returns whether it was."""
+        cursor = self._execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (to_status, time.time(), job_id, from_status),
+        )
+        return cursor.rowcount > 0
+
+    def heartbeat(self, job_ids):
+        """Renews the lease of these jobs while they are still running."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        placeholders = ", ".join("?" for _ in job_ids)
+        self._execute(f"UPDATE jobs SET updated_at = ? WHERE status = ? AND id IN ({placeholders})",
+                      (time.time(), JOB_RUNNING, *job_ids))
+
+    def requeue_expired(self):
+        """Puts running jobs whose lease lapsed back in the queue and returns their ids."""
+        cutoff = time.time() - self.lease
+        with self._lock:
+            job_ids = [row[0] for row in self._db.execute(
+                "SELECT id FROM jobs WHERE status = ? AND updated_at < ?", (JOB_RUNNING, cutoff))]
+            if not job_ids:
+                return []
+            # Only if still expired: another process may have requeued (and claimed) it meanwhile.
+            self._db.executemany(
+                "UPDATE jobs SET status = ?, progress_done = 0, progress_total = NULL, updated_at = ? "
+                "WHERE id = ? AND status = ? AND updated_at < ?",
+                [(JOB_QUEUED, time.time(), job_id, JOB_RUNNING, cutoff) for job_id in job_ids])
+            self._db.commit()
+        return job_ids
+
+    def claim_next(self):
+        """
+        Marks the next queued job (lowest priority number, then oldest) as
+        running and returns its id, or None when nothing is queued. Jobs
+        whose lease lapsed are requeued first. Each job is claimed once at a
+        time, also by processes sharing the database.
+        """
+        for job_id in self.requeue_expired():
+            print(f"Job {job_id} lost its worker; requeued")
+        while True:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY priority, created_at LIMIT 1", (JOB_QUEUED,)
+                ).fetchone()
+            if row is None:
+                return None
+            if self.transition(row[0], JOB_QUEUED, JOB_RUNNING):
+                return row[0]
+
+    def fail_interrupted(self):
+        """Marks jobs left running by a previous process as failed and returns their ids."""
+        with self._lock:
+            job_ids = [row[0] for row in self._db.execute("SELECT id FROM jobs WHERE status = ?", (JOB_RUNNING,))]
+        for job_id in job_ids:
+            self.update(job_id, status=JOB_FAILED, error="Interrupted by a server restart.")
+        return job_ids
+
+    def purge(self):
+        """Drops expired jobs, then the oldest results beyond the size bound. Returns the ids removed."""
+        placeholders = ", ".join("?" for _ in FINISHED_STATES)
+        with self._lock:
+            expired = [row[0] for row in self._db.execute(
+                f"SELECT id FROM jobs WHERE status IN ({placeholders}) AND updated_at < ?",
+                (*FINISHED_STATES, time.time() - self.ttl),
+            )]
+            rows = self._db.execute(
+                f"SELECT id, result_bytes FROM jobs WHERE status IN ({placeholders}) ORDER BY updated_at DESC",
+                FINISHED_STATES,
+            ).fetchall()
+            kept_bytes = 0
+            for row in rows:
+                kept_bytes += row["result_bytes"]
+                if kept_bytes > self.max_result_bytes and row["id"] not in expired:
+                    expired.append(row["id"])
+            self._db.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in expired])
+            self._db.commit()
+        return expired
+
+
+class JobInterrupted(Exception):
+    pass
+
+
+class JobQueue:
+    """
+    Runs jobs from a JobStore on background worker threads, lowest priority
+    number first. No external broker: the store is the queue. Workers claim
+    queued jobs from it, so every server process sharing the database can
+    run them, each job once. A submit wakes this process's workers at once;
+    other processes pick jobs up within `poll_interval` seconds.
+
+    `handler(job, report_progress)` does the work and returns the result;
+    `report_progress(done, total)` raises JobCancelled once cancellation has
+    been requested, so handlers stop at the next unit boundary. While the
+    queue is stopping it raises JobInterrupted instead, and the job goes
+    back to the queue for another worker. A heartbeat thread renews the
+    leases of the jobs this process is running every third of the store's
+    lease, so only jobs of a process that died are requeued.
+
+    Expired jobs are purged after each job and, while idle, every
+    `purge_interval` seconds.
+    """
+
+    def __init__(self, store, handler, workers, on_finished=None, poll_interval=1.0, purge_interval=60.0):
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.on_finished = on_finished
+        self.poll_interval = poll_interval
+        self.purge_interval = purge_interval
+        self._purged_at = time.monotonic()
+        self._wakeup = threading.Condition()
+        self._submitted = False
+        self._stopping = False
+        self._threads = []
+        self._running = set()  # ids of the jobs this process's workers are running
+
+    def recover(self):
+        """Fails jobs left running by a previous server. Call once, before any worker starts."""
+        for job_id in self.store.fail_interrupted():
+            self._finished(job_id)
+
+    def start(self):
+        """Starts the worker threads in this process; a forked child inherits none, so it calls this itself."""
+        self._stopping = False
+        self._threads = [threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+        threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True).start()
+
+    def stop(self, timeout=None):
+        """
+        Stops claiming jobs and waits up to `timeout` seconds for the running
+        ones, which return to the queue at their next progress report.
+        """
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def submit(self, params, priority=10):
+        job_id = self.store.create(params, priority)
+        with self._wakeup:
+            self._submitted = True
+            self._wakeup.notify()
+        return job_id
+
+    def cancel(self, job_id):
+        """Cancels a queued job immediately; a running job stops at its next progress report."""
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINISHED_STATES:
+            return job
+        self.store.request_cancel(job_id)
+        if self.store.transition(job_id, JOB_QUEUED, JOB_CANCELLED):
+            self._finished(job_id)
+        return self.store.get(job_id)
+
+    def _finished(self, job_id):
+        if self.on_finished:
+            self.on_finished(self.store.get(job_id))
+
+    def _worker(self):
+        while True:
+            with self._wakeup:
+                if self._stopping:
+                    return
+                self._submitted = False
+            job_id = self.store.claim_next()
+            if job_id is None:
+                self._purge_if_due()
+                with self._wakeup:
+                    if not (self._stopping or self._submitted):
+                        self._wakeup.wait(self.poll_interval)
+                continue
+            self._running.add(job_id)
+            try:
+                self._run(self.store.get(job_id))
+            finally:
+                self._running.discard(job_id)
+
+    def _heartbeat(self):
+        # Outlives stop() until the running jobs have gone back to the queue.
+        while True:
+            with self._wakeup:
+                if self._stopping and not self._running:
+                    return
+                self._wakeup.wait(self.store.lease / 3)
+            self.store.heartbeat(list(self._running))
+
+    def _run(self, job):
+        job_id = job["id"]
+
+        def report_progress(done, total=None):
+            if self._stopping:
+                raise JobInterrupted()
+            if self.store.is_cancel_requested(job_id):
+                raise JobCancelled()
+            self.store.update(job_id, progress_done=done, progress_total=total)
+
+        try:
+            result = self.handler(job, report_progress)
+            self.store.update(job_id, status=JOB_DONE, result=result)
+        except JobInterrupted:
+            self.store.update(job_id, status=JOB_QUEUED, progress_done=0, progress_total=None)
+            return
+        except JobCancelled:
+            self.store.update(job_id, status=JOB_CANCELLED)
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            self.store.update(job_id, status=JOB_FAILED, error=str(e))
+        self._finished(job_id)
+        self._purge()
+
+    def _purge_if_due(self):
+        if time.monotonic() - self._purged_at >= self.purge_interval:
+            self._purge()
+
+    def _purge(self):
+        self._purged_at = time.monotonic()
+        self.store.purge()
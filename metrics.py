@@ -0,0 +1,159 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Stage totals of the request being handled, if any. Thread pools that work
+# on behalf of a request run their tasks in a copy of its context, so their
+# stages land here too.
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class RequestTimings:
+    """Seconds and call counts per stage for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages = {}
+
+    def add(self, stage, seconds):
+        with self._lock:
+            total, calls = self.stages.get(stage, (0.0, 0))
+            self.stages[stage] = (total + seconds, calls + 1)
+
+    def server_timing(self):
+        """
+        A Server-Timing header value. Stages that ran in parallel or nested in
+        one another are summed separately, so they can add up to more than
+        `total`.
+        """
+        with self._lock:
+            entries = [f"{stage};dur={total * 1000:.1f};desc=\"{calls} calls\""
+                       for stage, (total, calls) in sorted(self.stages.items())]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+class Metrics:
+    """
+    Process-wide stage timers (histograms) and counters with labels, rendered
+    in the Prometheus text exposition format.
+    """
+
+    def __init__(self, namespace, buckets=DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self._counters = {}    # (name, labels) -> value
+        self._help = {}
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            values = self._histograms.get(key)
+            if values is None:
+                values = self._histograms[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    values[i] += 1
+            values[-2] += seconds
+            values[-1] += 1
+
+    def count(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def record_stage(self, stage, seconds, **labels):
+        self.observe("stage_seconds", seconds, stage=stage, **labels)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.add(stage, seconds)
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        """Times the body as one call of `stage`, also when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.perf_counter() - start, **labels)
+
+    def timed_iter(self, iterable, stage, **labels):
+        """Yields from iterable, timing the production of each item as one call of `stage`."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.record_stage(stage, time.perf_counter() - start, **labels)
+            yield item
+
+    def start_request(self):
+        """Starts collecting a per-request breakdown in the current context; returns (timings, token)."""
+        timings = RequestTimings()
+        return timings, _request_timings.set(timings)
+
+    def end_request(self, token):
+        _request_timings.reset(token)
+
+    def render(self, gauges=()):
+        """
+        Prometheus text format. `gauges` adds (name, labels dict, value)
+        samples computed by the caller, e.g. cache statistics.
+        """
+        lines = []
+        with self._lock:
+            histograms = {key: list(values) for key, values in self._histograms.items()}
+            counters = dict(self._counters)
+        for name in sorted({name for name, _ in histograms}):
+            full_name = f"{self.namespace}_{name}"
+            lines.append(f"# HELP {full_name} {self._help.get(name, name)}")
+            lines.append(f"# TYPE {full_name} histogram")
+            for (key_name, labels), values in sorted(histograms.items()):
+                if key_name != name:
+                    continue
+                for bound, bucket_count in zip(self.buckets, values):
+                    lines.append(f"{full_name}_bucket{_format_labels(labels, [('le', bound)])} {bucket_count}")
+                lines.append(f"{full_name}_bucket{_format_labels(labels, [('le', '+Inf')])} {values[-1]}")
+                lines.append(f"{full_name}_sum{_format_labels(labels)} {values[-2]:.6f}")
+                lines.append(f"{full_name}_count{_format_labels(labels)} {values[-1]}")
+        for name in sorted({name for name, _ in counters}):
+            full_name = f"{self.namespace}_{name}_total"
+            lines.append(f"# HELP {full_name} {self._help.get(name, name)}")
+            lines.append(f"# TYPE {full_name} counter")
+            for (key_name, labels), value in sorted(counters.items()):
+                if key_name == name:
+                    lines.append(f"{full_name}{_format_labels(labels)} {value}")
+        gauge_names = []
+        for name, _, _ in gauges:
+            if name not in gauge_names:
+                gauge_names.append(name)
+        for name in gauge_names:
+            full_name = f"{self.namespace}_{name}"
+            lines.append(f"# TYPE {full_name} gauge")
+            for gauge_name, labels, value in gauges:
+                if gauge_name == name:
+                    lines.append(f"{full_name}{_format_labels(sorted(labels.items()))} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,143 @@
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+
+
+class OcrCache:
+    """
+    Content-addressed store of OCR results in SQLite. Keys hash the raw image
+    bytes together with a version string for the prompt and pre-processing
+    settings. Once stored text exceeds `max_bytes`, the least recently used
+    entries are evicted.
+    """
+
+    def __init__(self, db_path, max_bytes, version):
+        self.max_bytes = max_bytes
+        self.version = version
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.images_skipped = 0
+        self.bytes_in = 0
+        self.bytes_sent = 0
+
+        self.db_path = db_path
+        self._inherited_db = None
+        self._db = self._connect()
+
+    def _connect(self):
+        directory = os.path.dirname(self.db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(self.db_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_results ("
+            "key TEXT PRIMARY KEY, text TEXT, size INTEGER, last_used REAL)"
+        )
+        db.commit()
+        return db
+
+    def reopen(self):
+        """Opens a new connection in a forked worker; the inherited one is left to the parent."""
+        db = self._connect()
+        with self._lock:
+            self._inherited_db, self._db = self._db, db
+
+    def make_key(self, image_bytes):
+        digest = hashlib.sha256(image_bytes)
+        digest.update(self.version.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, image_bytes):
+        key = self.make_key(image_bytes)
+        with self._lock:
+            row = self._db.execute("SELECT text FROM ocr_results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE ocr_results SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return row[0]
+
+    def put(self, image_bytes, text):
+        key = self.make_key(image_bytes)
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO ocr_results VALUES (?, ?, ?, ?)", (key, text, size, time.time())
+            )
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_results").fetchone()[0]
+            while total > self.max_bytes:
+                row = self._db.execute(
+                    "SELECT key, size FROM ocr_results ORDER BY last_used LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    break
+                self._db.execute("DELETE FROM ocr_results WHERE key = ?", (row[0],))
+                total -= row[1]
+                self.evictions += 1
+            self._db.commit()
+
+    def record_upload(self, original_size, sent_size):
+        with self._lock:
+            self.bytes_in += original_size
+            self.bytes_sent += sent_size
+
+    def record_skip(self):
+        with self._lock:
+            self.images_skipped += 1
+
+    def stats(self):
+        with self._lock:
+            entries, stored_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_results"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+                "stored_bytes": stored_bytes,
+                "images_skipped": self.images_skipped,
+                "upload_bytes_in": self.bytes_in,
+                "upload_bytes_sent": self.bytes_sent,
+                "upload_bytes_saved": self.bytes_in - self.bytes_sent,
+            }
+
+
+def prepare_image_for_ocr(image_bytes, min_pixels, min_entropy, max_dimension, jpeg_quality):
+    """
+    Returns the image re-encoded for upload as (bytes, mime_type), or None when
+    it is too small or too uniform to hold text (spacer pixels, icons, blank
+    stamps). Images larger than max_dimension on either side are downscaled
+    and sent as the smaller of their JPEG and PNG encodings. Other images are
+    sent as the smallest of the original and those encodings.
+    """
+    from PIL import Image  # imported on first use to keep app startup light
+    image = Image.open(io.BytesIO(image_bytes))
+    width, height = image.size
+    if width * height < min_pixels:
+        return None
+    if image.convert("L").entropy() < min_entropy:
+        return None
+    resized = max(width, height) > max_dimension
+    if resized:
+        image.thumbnail((max_dimension, max_dimension))
+    elif image.format == "JPEG":
+        return image_bytes, "image/jpeg"
+    candidates = []
+    if not resized and image.format in ("JPEG", "PNG"):
+        candidates.append((image_bytes, Image.MIME[image.format]))
+    for format, mime_type, options in (("JPEG", "image/jpeg", {"quality": jpeg_quality}), ("PNG", "image/png", {})):
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format=format, optimize=True, **options)
+        candidates.append((buffer.getvalue(), mime_type))
+    return min(candidates, key=lambda candidate: len(candidate[0]))
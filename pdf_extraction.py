@@ -0,0 +1,109 @@
+import contextvars
+import hashlib
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+_process_pool = None
+_process_pool_pid = None
+
+
+def _get_process_pool(processes):
+    """
+    The extraction pool of this process. Its processes are started by a
+    forkserver (or spawned where there is none), never forked from the
+    server: forking a process whose other threads hold locks can deadlock
+    the child.
+    """
+    global _process_pool, _process_pool_pid
+    if _process_pool is None or _process_pool_pid != os.getpid():
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _process_pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context(method))
+        _process_pool_pid = os.getpid()
+    return _process_pool
+
+
+def open_pdf(pdf):
+    """Opens a PDF given as a path or as the file's bytes."""
+    import fitz  # PyMuPDF, imported on first use to keep app startup light
+    if isinstance(pdf, (bytes, bytearray)):
+        return fitz.open(stream=pdf, filetype="pdf")
+    return fitz.open(pdf)
+
+
+def _extract_pages(pdf, start, end):
+    """Returns (page_text, [image xrefs]) for pages start..end-1. Runs in a pool process."""
+    pages = []
+    with open_pdf(pdf) as doc:
+        for page_number in range(start, end):
+            page = doc[page_number]
+            pages.append((page.get_text(), [img[0] for img in page.get_images(full=True)]))
+    return pages
+
+
+def format_image_block(text_from_image):
+    if not text_from_image:
+        # Images skipped by OCR pre-processing leave no block behind.
+        return ""
+    return f"\n--- [Image Content] ---\n{text_from_image}\n--- [End Image Content] ---\n"
+
+
+def iter_pdf_pages(pdf, ocr_fn, processes=1, max_inflight_ocr=4, pages_per_task=4, window_pages=32):
+    """
+    Yields the text of each PDF page, in order, followed by the OCR text of the
+    page's images. `pdf` is a path or the file's bytes.
+
+    Pages are handled in windows of `window_pages`: the window's text is
+    extracted across a process pool (`pages_per_task` pages per task), its
+    images are deduplicated by xref and then by content hash against
+    everything already seen in the document, and only unseen images go to
+    `ocr_fn(image_bytes)`, at most `max_inflight_ocr` at a time.
+
+    When `pdf` is bytes and the pool is used, the bytes are written once to
+    a temporary file that the tasks open by path, rather than pickled into
+    every task.
+    """
+    spill_path = None
+    try:
+        with open_pdf(pdf) as doc:
+            page_count = len(doc)
+            use_pool = processes > 1 and page_count > pages_per_task
+            task_pdf = pdf
+            if use_pool and isinstance(pdf, (bytes, bytearray)):
+                with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+                    spill_path = f.name
+                    f.write(pdf)
+                task_pdf = spill_path
+            ocr_by_hash = {}   # sha256 of image bytes -> OCR text
+            hash_by_xref = {}
+            with ThreadPoolExecutor(max_workers=max_inflight_ocr, thread_name_prefix="pdf-ocr") as ocr_pool:
+                for window_start in range(0, page_count, window_pages):
+                    window_end = min(window_start + window_pages, page_count)
+                    ranges = [(start, min(start + pages_per_task, window_end))
+                              for start in range(window_start, window_end, pages_per_task)]
+                    if use_pool and len(ranges) > 1:
+                        pool = _get_process_pool(processes)
+                        chunks = pool.map(_extract_pages, [task_pdf] * len(ranges), *zip(*ranges))
+                    else:
+                        chunks = [_extract_pages(pdf, start, end) for start, end in ranges]
+                    pages = [page for chunk in chunks for page in chunk]
+
+                    pending = {}
+                    for _, xrefs in pages:
+                        for xref in xrefs:
+                            if xref in hash_by_xref:
+                                continue
+                            image_bytes = doc.extract_image(xref)["image"]
+                            image_hash = hashlib.sha256(image_bytes).hexdigest()
+                            hash_by_xref[xref] = image_hash
+                            if image_hash not in ocr_by_hash and image_hash not in pending:
+                                pending[image_hash] = ocr_pool.submit(contextvars.copy_context().run, ocr_fn, image_bytes)
+                    for image_hash, future in pending.items():
+                        ocr_by_hash[image_hash] = future.result()
+
+                    for page_text, xrefs in pages:
+                        yield page_text + "".join(format_image_block(ocr_by_hash[hash_by_xref[xref]]) for xref in xrefs)
+    finally:
+        if spill_path is not None:
+            os.unlink(spill_path)
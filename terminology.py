@@ -0,0 +1,337 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from glossary_index import GlossaryMatcher, glossary_terms, tokenize
+
+FORMAT = 1
+TOKEN_SEPARATOR = "\x1f"
+# SQLite binds at most 999 parameters per statement on older builds.
+_MAX_PARAMS = 900
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE languages (lang TEXT PRIMARY KEY, max_term_tokens INTEGER);
+CREATE TABLE terms (english TEXT, lang TEXT, term TEXT, position INTEGER, tokens TEXT);
+CREATE TABLE recommendations (english TEXT, lang TEXT, items TEXT, PRIMARY KEY (english, lang));
+"""
+_INDEXES = """
+CREATE INDEX terms_by_english ON terms (english, lang);
+CREATE INDEX terms_by_tokens ON terms (lang, tokens);
+"""
+
+
+def compile_terminology(source_path, index_path):
+    """
+    Compiles a terminology JSON file into a read-only SQLite index at
+    index_path. The index is built next to the target and moved into place
+    with an atomic rename, so readers see either the old or the new index.
+
+    The source holds "concepts" (english concept -> {lang: term or [terms]}),
+    "departments" (department -> {lang: name}) and "symptom_departments"
+    (english concept -> [departments]). Recommendation lists are
+    precomputed for every language, plus a "" entry with English names for
+    languages the file does not cover.
+    """
+    with open(source_path, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw.decode("utf-8"))
+    if data.get("format") != FORMAT:
+        raise ValueError(f"{source_path}: unsupported terminology format {data.get('format')!r}")
+    concepts = data["concepts"]
+    departments = data.get("departments", {})
+    symptom_departments = data.get("symptom_departments", {})
+
+    directory = os.path.dirname(index_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    db = sqlite3.connect(tmp_path)
+    try:
+        db.executescript(_SCHEMA)
+        langs = sorted({lang for translations in concepts.values() for lang in translations}
+                       | {lang for names in departments.values() for lang in names})
+        max_tokens = {}
+        rows = []
+        for lang in langs:
+            positions = {}
+            for english, term in glossary_terms(concepts, lang):
+                tokens = [token for token, _, _ in tokenize(term)]
+                if not tokens:
+                    continue
+                position = positions[english] = positions.get(english, -1) + 1
+                rows.append((english, lang, term, position, TOKEN_SEPARATOR.join(tokens)))
+                max_tokens[lang] = max(max_tokens.get(lang, 0), len(tokens))
+        db.executemany("INSERT INTO terms VALUES (?, ?, ?, ?, ?)", rows)
+        db.executemany("INSERT INTO languages VALUES (?, ?)", sorted(max_tokens.items()))
+
+        recommendation_rows = []
+        for english, department_names in symptom_departments.items():
+            if english not in concepts:
+                continue
+            for lang in langs + [""]:
+                keyword = concepts[english].get(lang, english) if lang else english
+                items = [{"keyword": keyword, "department": departments.get(name, {}).get(lang, name) if lang else name}
+                         for name in department_names]
+                recommendation_rows.append((english, lang, json.dumps(items, ensure_ascii=False)))
+        db.executemany("INSERT INTO recommendations VALUES (?, ?, ?)", recommendation_rows)
+
+        db.executescript(_INDEXES)
+        db.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("format", str(FORMAT)),
+            ("revision", str(data.get("revision", ""))),
+            ("source_sha256", hashlib.sha256(raw).hexdigest()),
+            ("concepts", str(len(concepts))),
+            ("terms", str(len(rows))),
+            ("compiled_at", str(time.time())),
+            ("recommendation_languages", json.dumps(langs)),
+        ])
+        db.commit()
+        db.close()
+    except BaseException:
+        db.close()
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, index_path)
+
+
+def _index_source_sha256(index_path):
+    try:
+        db = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+        try:
+            row = db.execute("SELECT value FROM meta WHERE key = 'source_sha256'").fetchone()
+        finally:
+            db.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class TerminologyStore:
+    """
+    Medical terminology served from a compiled, memory-mapped SQLite index:
+    keyword detection, forward (concept -> term) and reverse (term ->
+    concept) lookups, and precomputed department recommendations.
+
+    Keyword detection and term location run on one GlossaryMatcher per
+    language, built from the index on first use (or by preload()) and kept
+    until the next reload. Each thread reads through its own connection, so
+    lookups do not wait on each other, and the mapped pages are shared by
+    every process that opens the same file. Every `check_interval` seconds
+    the source file is checked; when it has changed, the checking thread
+    recompiles it and swaps the new index in atomically, without blocking
+    other lookups, which keep using the old index until the swap. A process
+    that was forked opens its own connections on first use and keeps the
+    matchers it inherited while the index is unchanged, so matchers preloaded
+    before a preforking server forks are shared by all its workers.
+    """
+
+    def __init__(self, source_path, index_path, check_interval=5.0, mmap_bytes=256 * 1024 * 1024):
+        self.source_path = source_path
+        self.index_path = index_path
+        self.check_interval = check_interval
+        self.mmap_bytes = mmap_bytes
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._matcher_lock = threading.Lock()
+        self.reloads = 0
+        self.reload_errors = 0
+        self._local = threading.local()  # this thread's (pid, generation) and connection
+        self._generation = 0
+        self._matchers = {}              # lang -> GlossaryMatcher of the current generation
+        self._pid = None
+        self._inherited_dbs = []
+        self._reload()
+
+    def _reload(self):
+        """Compiles the source if the index does not match it, then opens the index."""
+        with self._reload_lock:
+            source_signature = _file_signature(self.source_path)
+            if (self._pid == os.getpid()
+                    and (source_signature, _file_signature(self.index_path)) == self._signatures):
+                return  # another thread reloaded while this one waited
+            with open(self.source_path, "rb") as f:
+                source_sha256 = hashlib.sha256(f.read()).hexdigest()
+            if _index_source_sha256(self.index_path) != source_sha256:
+                print(f"Compiling terminology {self.source_path} -> {self.index_path}")
+                compile_terminology(self.source_path, self.index_path)
+            index_signature = _file_signature(self.index_path)
+            db = self._connect()
+            try:
+                meta = dict(db.execute("SELECT key, value FROM meta"))
+                max_tokens = dict(db.execute("SELECT lang, max_term_tokens FROM languages"))
+            finally:
+                db.close()
+            with self._lock:
+                reloaded = self._pid == os.getpid()
+                self._meta, self._max_tokens = meta, max_tokens
+                self._recommendation_langs = set(json.loads(meta.get("recommendation_languages", "[]")))
+                self._signatures = (source_signature, index_signature)
+                # Connections and matchers of older generations are replaced on next use.
+                self._matchers = {}
+                self._generation += 1
+                self._pid = os.getpid()
+                self._checked_at = time.monotonic()
+                if reloaded:
+                    self.reloads += 1
+
+    def _connect(self):
+        db = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True)
+        db.execute(f"PRAGMA mmap_size = {int(self.mmap_bytes)}")
+        return db
+
+    def _connection(self):
+        """This thread's connection to the current index, opened on first use."""
+        local = self._local
+        key = (os.getpid(), self._generation)
+        if getattr(local, "key", None) != key:
+            old_db = getattr(local, "db", None)
+            if old_db is not None and local.key[0] != os.getpid():
+                # Inherited across fork(): the parent still owns this connection; leave it alone.
+                self._inherited_dbs.append(old_db)
+            elif old_db is not None:
+                old_db.close()
+            local.db, local.key = self._connect(), key
+        return local.db
+
+    def _maybe_reload(self):
+        if self._pid != os.getpid():
+            # SQLite connections must not be shared across fork(); _connection()
+            # opens this process's own. The inherited matchers stay valid (and
+            # shared with the parent) as long as the index has not changed.
+            if (_file_signature(self.source_path), _file_signature(self.index_path)) == self._signatures:
+                with self._lock:
+                    self._pid = os.getpid()
+                    self._checked_at = time.monotonic()
+                return
+            self._reload()
+            return
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+        self._checked_at = time.monotonic()
+        if (_file_signature(self.source_path), _file_signature(self.index_path)) == self._signatures:
+            return
+        try:
+            self._reload()
+        except Exception as e:
+            # Keep serving the last good index.
+            self.reload_errors += 1
+            print(f"Terminology reload failed, keeping revision {self._meta.get('revision')}: {e}")
+
+    def _query(self, sql, params=()):
+        self._maybe_reload()
+        return self._connection().execute(sql, params).fetchall()
+
+    def _query_in(self, sql, fixed_params, values):
+        """Runs sql (ending in an IN list placeholder `{}`) over values in parameter-sized chunks."""
+        values = list(values)
+        rows = []
+        for start in range(0, len(values), _MAX_PARAMS):
+            chunk = values[start:start + _MAX_PARAMS]
+            rows += self._query(sql.format(",".join("?" * len(chunk))), tuple(fixed_params) + tuple(chunk))
+        return rows
+
+    @property
+    def revision(self):
+        return self._meta.get("revision")
+
+    def languages(self):
+        return sorted(self._max_tokens)
+
+    def terms(self, english, lang):
+        """Forward lookup: the `lang` terms of an english concept, preferred first."""
+        return [row[0] for row in self._query(
+            "SELECT term FROM terms WHERE english = ? AND lang = ? ORDER BY position", (english, lang))]
+
+    def concepts_for_term(self, term, lang):
+        """Reverse lookup: english concepts that `term` (any case) names in `lang`."""
+        tokens = TOKEN_SEPARATOR.join(token for token, _, _ in tokenize(term))
+        return list(dict.fromkeys(row[0] for row in self._query(
+            "SELECT english FROM terms WHERE lang = ? AND tokens = ?", (lang, tokens))))
+
+    def _matcher(self, lang):
+        """The `lang` matcher of the current index, built once per language and reload; None for unknown languages."""
+        self._maybe_reload()
+        if lang not in self._max_tokens:
+            return None
+        matchers = self._matchers
+        matcher = matchers.get(lang)
+        if matcher is None:
+            with self._matcher_lock:
+                matcher = matchers.get(lang)
+                if matcher is None:
+                    rows = self._connection().execute("SELECT english, tokens FROM terms WHERE lang = ?", (lang,)).fetchall()
+                    matcher = matchers[lang] = GlossaryMatcher.from_keys(
+                        lang, ((english, tuple(tokens.split(TOKEN_SEPARATOR))) for english, tokens in rows))
+        return matcher
+
+    def preload(self, langs=None):
+        """
+        Builds the matchers of `langs` (default: every language in the index)
+        now rather than on first use, e.g. before a preforking server forks.
+        """
+        for lang in self.languages() if langs is None else langs:
+            self._matcher(lang)
+
+    def find_concepts(self, text, lang):
+        """Returns the english concepts whose `lang` term occurs in text."""
+        matcher = self._matcher(lang)
+        if matcher is None:
+            return []
+        return list(dict.fromkeys(hit.english for hit in matcher.find_all(text)))
+
+    def locate_terms(self, text, lang, english_terms):
+        """
+        Maps each requested english concept to the first surface form of its
+        `lang` term found in text (suffixes allowed).
+        """
+        wanted = set(english_terms)
+        matcher = self._matcher(lang) if wanted else None
+        if matcher is None:
+            return {}
+        located = {}
+        for hit in matcher.find_all(text, allow_suffix=True, wanted=wanted):
+            if hit.english not in located:
+                located[hit.english] = hit.surface
+        return located
+
+    def recommendations(self, english_terms, lang):
+        """Departments for each concept, in order, named in `lang` (English for unknown languages)."""
+        wanted = list(dict.fromkeys(english_terms))
+        if not wanted:
+            return []
+        row_lang = lang if lang in self._recommendation_langs else ""
+        items = dict(self._query_in("SELECT english, items FROM recommendations WHERE lang = ? AND english IN ({})", (row_lang,), wanted))
+        return [item for english in wanted if english in items for item in json.loads(items[english])]
+
+    def stats(self):
+        return {
+            "revision": self._meta.get("revision"),
+            "concepts": int(self._meta.get("concepts", 0)),
+            "terms": int(self._meta.get("terms", 0)),
+            "languages": len(self._max_tokens),
+            "matchers": len(self._matchers),
+            "index_bytes": os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+        }
+
+
+if __name__ == "__main__":
+    # python terminology.py data/terminology.json cache/terminology.sqlite3
+    compile_terminology(sys.argv[1], sys.argv[2])
+    print(f"Compiled {sys.argv[1]} -> {sys.argv[2]}")
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+
+@pytest.fixture(scope="session")
+def app_workdir(tmp_path_factory):
+    """Working directory app.py is imported from; it keeps its caches under it."""
+    return tmp_path_factory.mktemp("app")
+
+
+@pytest.fixture(scope="session")
+def app_module(app_workdir):
+    cwd = os.getcwd()
+    os.chdir(app_workdir)
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    return app
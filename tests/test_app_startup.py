@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+from conftest import REPO
+from job_queue import JOB_CANCELLED, JOB_QUEUED, JOB_RUNNING
+
+SECOND_PROCESS = """
+import app
+app.ensure_started()
+print(app.job_store.get({job_id!r})["status"])
+"""
+
+
+def test_first_request_starts_background_work(app_module):
+    app_module.app.test_client().get("/healthz")
+    assert app_module._started_pid == os.getpid()
+    assert any(thread.is_alive() for thread in app_module.job_queue._threads)
+
+
+def test_only_the_first_server_process_recovers_jobs(app_module, app_workdir):
+    app_module.ensure_started()
+    job_id = app_module.job_store.create({}, 10)
+    assert app_module.job_store.transition(job_id, JOB_QUEUED, JOB_RUNNING)
+    try:
+        # A second process of the same server (same lock file and job store) must
+        # leave the job alone: this process is still running it.
+        output = subprocess.run([sys.executable, "-c", SECOND_PROCESS.format(job_id=job_id)], cwd=app_workdir,
+                                env=dict(os.environ, PYTHONPATH=REPO), capture_output=True, text=True, check=True)
+        assert output.stdout.strip().splitlines()[-1] == JOB_RUNNING
+    finally:
+        app_module.job_store.transition(job_id, JOB_RUNNING, JOB_CANCELLED)
@@ -0,0 +1,26 @@
+import csv
+import io
+
+from csv_translation import iter_translated_csv
+
+
+def translate_csv(text, chunk_rows):
+    def translate_batch(values, source_lang, target_lang):
+        return [value.upper() for value in values]
+    chunks = iter_translated_csv(io.BytesIO(text.encode("utf-8")), "en", "es", translate_batch,
+                                 lambda value, lang: [], lambda keywords, value, lang: [], chunk_rows=chunk_rows)
+    return list(csv.reader(io.StringIO("".join(csv_text for csv_text, _ in chunks))))
+
+
+def test_free_text_after_code_only_rows_is_translated():
+    rows = translate_csv("name,notes\nP1,ICD-10\nP2,has fever now\nP3,\n", chunk_rows=1)
+    assert rows == [["name", "notes"], ["P1", "ICD-10"], ["P2", "HAS FEVER NOW"], ["P3", ""]]
+
+
+def test_codes_numbers_and_dates_are_written_back_unchanged():
+    text = "id,age,visit,diagnosis\nP0012345,007,2024-03-01,fever\nP0012346,42,2024-03-02,\"cough, dry\"\n"
+    assert translate_csv(text, chunk_rows=500) == [
+        ["id", "age", "visit", "diagnosis"],
+        ["P0012345", "007", "2024-03-01", "FEVER"],
+        ["P0012346", "42", "2024-03-02", "COUGH, DRY"],
+    ]
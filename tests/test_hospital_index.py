@@ -0,0 +1,81 @@
+import json
+import threading
+import time
+
+from hospital_index import HospitalIndex
+
+
+def slow_fetch(calls, delay=0.2):
+    lock = threading.Lock()
+
+    def fetch(south, west, north, east):
+        with lock:
+            calls.append((south, west, north, east))
+        time.sleep(delay)
+        return [{"id": len(calls), "name": "Hospital", "lat": (south + north) / 2, "lon": (west + east) / 2}]
+    return fetch
+
+
+def run_concurrently(index, points, fetch):
+    threads = [threading.Thread(target=index.ensure_area, args=(lat, lon, 100, fetch)) for lat, lon in points]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def test_concurrent_requests_for_the_same_tile_share_one_fetch():
+    index = HospitalIndex(tile_deg=0.1)
+    calls = []
+    run_concurrently(index, [(28.55, 77.25)] * 8, slow_fetch(calls))
+    assert len(calls) == 1
+    assert index.tile_misses == 1 and index.tile_hits == 7
+
+
+def test_requests_for_different_tiles_do_not_wait_for_each_other():
+    index = HospitalIndex(tile_deg=0.1)
+    calls = []
+    elapsed = run_concurrently(index, [(28.55, 77.25), (12.95, 77.55), (19.05, 72.85)], slow_fetch(calls))
+    assert len(calls) == 3
+    assert elapsed < 0.5
+
+
+def write_extract(path, points, bbox=None):
+    collection = {"type": "FeatureCollection", "features": [
+        {"type": "Feature", "properties": {"id": i, "name": f"Hospital {i}"},
+         "geometry": {"type": "Point", "coordinates": [lon, lat]}} for i, (lat, lon) in enumerate(points)]}
+    if bbox:
+        collection["bbox"] = bbox
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(collection, f)
+
+
+def test_extract_warms_only_the_tiles_holding_its_hospitals(tmp_path):
+    path = tmp_path / "hospitals.geojson"
+    write_extract(path, [(8.05, 68.05), (35.05, 97.05)])
+    index = HospitalIndex(tile_deg=0.1)
+    assert index.load_geojson(str(path)) == 2
+    assert len(index._loaded_at) == 2
+
+    calls = []
+    index.ensure_area(20.05, 80.05, 100, slow_fetch(calls, delay=0))
+    index.ensure_area(8.05, 68.05, 100, slow_fetch(calls, delay=0))
+    assert len(calls) == 1
+
+
+def test_extract_coverage_marks_the_tiles_inside_it_warm(tmp_path):
+    path = tmp_path / "hospitals.geojson"
+    write_extract(path, [(28.55, 77.25)], bbox=[77.0, 28.0, 78.0, 29.0])
+    index = HospitalIndex(tile_deg=0.1)
+    index.load_geojson(str(path))
+    calls = []
+    index.ensure_area(28.45, 77.65, 100, slow_fetch(calls, delay=0))
+    assert calls == []
+    index.ensure_area(29.55, 77.65, 100, slow_fetch(calls, delay=0))
+    assert len(calls) == 1
+
+    index = HospitalIndex(tile_deg=0.1)
+    index.load_geojson(str(path), coverage=(28.5, 77.2, 28.6, 77.3))
+    assert list(index._loaded_at) == [(285, 772)]
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import job_queue
+from job_queue import JOB_DONE, JOB_RUNNING, JobQueue, JobStore
+
+
+def test_expired_jobs_are_not_served(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(job_queue.time, "time", lambda: now[0])
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), ttl=60, max_result_bytes=1 << 20)
+    job_id = store.create({}, 10)
+    store.update(job_id, status=JOB_DONE, result={"text": "Patient Ana Ruiz"})
+    assert store.get(job_id)["result"] == {"text": "Patient Ana Ruiz"}
+    now[0] += 61
+    assert store.get(job_id) is None
+
+
+def test_idle_workers_purge_expired_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), ttl=0.1, max_result_bytes=1 << 20)
+    job_id = store.create({}, 10)
+    store.update(job_id, status=JOB_DONE, result={"text": "done"})
+    queue = JobQueue(store, lambda job, report_progress: None, workers=1, poll_interval=0.05, purge_interval=0.1)
+    queue.start()
+    try:
+        deadline = time.time() + 5
+        while time.time() < deadline and store._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]:
+            time.sleep(0.05)
+    finally:
+        queue.stop(5)
+    assert store._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 0
+
+
+def test_jobs_of_a_dead_worker_are_requeued_on_claim(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(job_queue.time, "time", lambda: now[0])
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), ttl=60, max_result_bytes=1 << 20, lease=30)
+    job_id = store.create({}, 10)
+    assert store.claim_next() == job_id
+    store.update(job_id, progress_done=1, progress_total=4)
+    now[0] += 20
+    assert store.claim_next() is None
+
+    # Nobody renewed the lease: the claiming process is gone.
+    now[0] += 11
+    assert store.claim_next() == job_id
+    job = store.get(job_id)
+    assert job["status"] == JOB_RUNNING and job["progress_done"] == 0
+
+
+def test_heartbeat_keeps_a_long_job_claimed(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), ttl=60, max_result_bytes=1 << 20, lease=0.3)
+    other_process = JobStore(str(tmp_path / "jobs.sqlite3"), ttl=60, max_result_bytes=1 << 20, lease=0.3)
+    started = threading.Event()
+
+    def handler(job, report_progress):
+        started.set()
+        time.sleep(1)  # one long unit without progress reports
+        return {"text": "done"}
+    queue = JobQueue(store, handler, workers=1, poll_interval=0.05)
+    job_id = queue.submit({})
+    queue.start()
+    try:
+        assert started.wait(5)
+        deadline = time.time() + 0.9
+        while time.time() < deadline:
+            assert other_process.claim_next() is None
+            time.sleep(0.05)
+        while store.get(job_id)["status"] == JOB_RUNNING:
+            time.sleep(0.05)
+    finally:
+        queue.stop(5)
+    assert store.get(job_id)["status"] == JOB_DONE
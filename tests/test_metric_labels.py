@@ -0,0 +1,13 @@
+def test_unknown_language_codes_are_labelled_other(app_module):
+    assert app_module.lang_label("es") == "es"
+    assert app_module.lang_label("x" * 200) == "other"
+    assert app_module.lang_label(None) == "other"
+    assert app_module.pair_label("en", "zz-injected") == "en-other"
+
+
+def test_client_language_codes_do_not_become_label_values(app_module):
+    client = app_module.app.test_client()
+    client.post("/api/translate", json={"text": "Patient has fever.", "source_lang": "qq1", "target_lang": "qq2"})
+    rendered = client.get("/metrics").get_data(as_text=True)
+    assert 'lang="other"' in rendered
+    assert "qq1" not in rendered and "qq2" not in rendered
@@ -0,0 +1,77 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+import map_standin
+
+LAT, LON = 28.6, 77.2
+
+
+@pytest.fixture
+def client(app_module, monkeypatch):
+    server = map_standin.start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setitem(app_module.app.config, "OVERPASS_URL", f"{base_url}/api/interpreter")
+    monkeypatch.setattr(app_module.osrm_client, "base_url", base_url)
+    monkeypatch.setattr(app_module, "hospital_index", app_module.HospitalIndex(0.1, 3600))
+    yield app_module.app.test_client()
+    server.shutdown()
+
+
+def test_returns_nearest_hospitals_by_driving_distance(client):
+    response = client.post("/api/nearby-hospitals-osm", json={"lat": LAT, "lon": LON, "limit": 3, "routes": 1})
+    assert response.status_code == 200
+    hospitals = response.get_json()
+    assert len(hospitals) == 3
+    assert [h["distance"] for h in hospitals] == sorted(h["distance"] for h in hospitals)
+    assert all(h["distance"] > 0 and h["duration"] > 0 for h in hospitals)
+    assert "geometry" in hospitals[0] and "geometry" not in hospitals[1]
+
+
+@pytest.mark.parametrize("payload", [{"limit": "abc"}, {"routes": "abc"}, {"limit": None}, {"limit": [3]}])
+def test_non_integer_limit_or_routes_is_rejected(client, payload):
+    response = client.post("/api/nearby-hospitals-osm", json=dict(payload, lat=LAT, lon=LON))
+    assert response.status_code == 400
+
+
+def test_numeric_strings_are_accepted_as_coordinates(client):
+    response = client.post("/api/nearby-hospitals-osm", json={"lat": str(LAT), "lon": str(LON), "limit": 1})
+    assert response.status_code == 200
+    assert len(response.get_json()) == 1
+
+
+@pytest.mark.parametrize("coordinates", [
+    {"lat": None, "lon": LON}, {"lat": "north", "lon": LON}, {"lat": [LAT], "lon": LON},
+    {"lat": "nan", "lon": LON}, {"lat": LAT, "lon": "inf"}, {"lat": 90.5, "lon": LON}, {"lat": LAT, "lon": -181},
+])
+def test_invalid_coordinates_are_rejected(client, coordinates):
+    response = client.post("/api/nearby-hospitals-osm", json=coordinates)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_limit_and_routes_are_clamped(client, app_module, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, "HOSPITAL_MAX_RESULTS", 4)
+    response = client.post("/api/nearby-hospitals-osm", json={"lat": LAT, "lon": LON, "limit": 10 ** 9, "routes": 10 ** 9})
+    assert response.status_code == 200
+    hospitals = response.get_json()
+    assert len(hospitals) == 4
+    assert all("geometry" in h for h in hospitals)
+
+
+def test_table_without_distances_falls_back_to_straight_line_order(client, monkeypatch):
+    send = map_standin.MapStandIn._send
+
+    def without_distances(self, payload):
+        payload.pop("distances", None)
+        return send(self, payload)
+    monkeypatch.setattr(map_standin.MapStandIn, "_send", without_distances)
+
+    response = client.post("/api/nearby-hospitals-osm", json={"lat": LAT, "lon": LON, "limit": 3})
+    assert response.status_code == 200
+    hospitals = response.get_json()
+    assert len(hospitals) == 3
+    assert all(h["distance"] == -1 for h in hospitals)
+    assert [h["air_distance"] for h in hospitals] == sorted(h["air_distance"] for h in hospitals)
@@ -0,0 +1,23 @@
+import io
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from ocr_cache import prepare_image_for_ocr
+
+
+def test_oversized_image_is_never_sent_at_full_resolution():
+    # A 1-bit dot grid: its PNG stays smaller than any downscaled re-encode.
+    image = Image.new("1", (4000, 3000), 1)
+    pixels = image.load()
+    for y in range(0, 3000, 3):
+        for x in range((y // 3) % 2, 4000, 3):
+            pixels[x, y] = 0
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", optimize=True)
+    original = buffer.getvalue()
+
+    prepared, mime_type = prepare_image_for_ocr(original, 48 * 48, 0.005, 1024, 85)
+    assert prepared != original
+    assert max(Image.open(io.BytesIO(prepared)).size) <= 1024
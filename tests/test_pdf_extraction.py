@@ -0,0 +1,89 @@
+import io
+import os
+import threading
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+Image = pytest.importorskip("PIL.Image")
+
+import pdf_extraction
+from pdf_extraction import iter_pdf_pages
+
+
+def png(seed):
+    buffer = io.BytesIO()
+    Image.effect_noise((64, 64), 20 + seed).convert("RGB").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def make_pdf(pages):
+    logo = png(0)
+    with fitz.open() as doc:
+        for page_number in range(pages):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"Page {page_number}")
+            page.insert_image(fitz.Rect(400, 20, 464, 84), stream=logo)
+            if page_number % 5 == 0:
+                page.insert_image(fitz.Rect(72, 200, 136, 264), stream=png(page_number + 1))
+        return doc.tobytes()
+
+
+def counting_ocr():
+    calls = []
+    lock = threading.Lock()
+
+    def ocr(image_bytes):
+        with lock:
+            calls.append(image_bytes)
+            return f"ocr {len(calls)}"
+    return ocr, calls
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_pages_in_order_and_each_distinct_image_ocred_once(processes):
+    pdf = make_pdf(10)
+    ocr, calls = counting_ocr()
+    pages = list(iter_pdf_pages(pdf, ocr, processes=processes, pages_per_task=2, window_pages=4))
+
+    assert len(pages) == 10
+    for page_number, page in enumerate(pages):
+        assert page.startswith(f"Page {page_number}")
+        assert page.count("--- [Image Content] ---") == (2 if page_number % 5 == 0 else 1)
+    # The logo repeats on every page; pages 0 and 5 add one image each.
+    assert len(calls) == 3
+    assert len(set(calls)) == 3
+
+
+def test_pdf_path_and_bytes_give_the_same_pages(tmp_path):
+    pdf = make_pdf(6)
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(pdf)
+    from_bytes = list(iter_pdf_pages(pdf, counting_ocr()[0], processes=2, pages_per_task=2))
+    from_path = list(iter_pdf_pages(str(path), counting_ocr()[0], processes=2, pages_per_task=2))
+    assert from_bytes == from_path
+
+
+def test_extraction_pool_does_not_fork_the_server():
+    pool = pdf_extraction._get_process_pool(2)
+    assert pool._mp_context.get_start_method() != "fork"
+
+
+def test_pdf_bytes_are_written_once_not_sent_to_every_task(monkeypatch):
+    sent = []
+
+    class RecordingPool:
+        def map(self, fn, pdfs, starts, ends):
+            pdfs = list(pdfs)
+            sent.extend(pdfs)
+            return [fn(pdf, start, end) for pdf, start, end in zip(pdfs, starts, ends)]
+
+    monkeypatch.setattr(pdf_extraction, "_get_process_pool", lambda processes: RecordingPool())
+    pdf = make_pdf(8)
+    pages = list(iter_pdf_pages(pdf, counting_ocr()[0], processes=2, pages_per_task=2))
+
+    assert len(pages) == 8
+    assert len(sent) == 4
+    assert all(isinstance(task_pdf, str) for task_pdf in sent)
+    assert len(set(sent)) == 1
+    assert not os.path.exists(sent[0])
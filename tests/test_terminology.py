@@ -0,0 +1,71 @@
+import json
+import os
+import threading
+
+from terminology import TerminologyStore
+
+
+def write_source(path, revision, concepts):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"format": 1, "revision": revision, "concepts": concepts}, f)
+
+
+def make_store(tmp_path, concepts=None):
+    source = tmp_path / "terminology.json"
+    write_source(source, "1", concepts or {"fever": {"en": "fever", "es": "fiebre"}})
+    return source, TerminologyStore(str(source), str(tmp_path / "terminology.sqlite3"), check_interval=0)
+
+
+def test_matcher_is_built_once_per_language(tmp_path):
+    _, store = make_store(tmp_path)
+    assert store.find_concepts("High fever since Monday.", "en") == ["fever"]
+    matcher = store._matcher("en")
+    assert store.find_concepts("Fever again.", "en") == ["fever"]
+    assert store.locate_terms("Tiene fiebres.", "es", ["fever"]) == {"fever": "fiebres"}
+    assert store._matcher("en") is matcher
+    assert store.stats()["matchers"] == 2
+
+
+def test_reload_rebuilds_matchers_from_the_new_index(tmp_path):
+    source, store = make_store(tmp_path)
+    assert store.find_concepts("Cough and fever.", "en") == ["fever"]
+    write_source(source, "2", {"fever": {"en": "fever"}, "cough": {"en": "cough"}})
+    os.utime(source, ns=(1, 1))  # a new signature even within the same mtime tick
+    assert store.find_concepts("Cough and fever.", "en") == ["cough", "fever"]
+    assert store.revision == "2" and store.reloads == 1
+
+
+def test_threads_read_through_their_own_connections(tmp_path):
+    _, store = make_store(tmp_path)
+    connections, results = [], []
+
+    def lookup():
+        results.append(store.find_concepts("fever", "en"))
+        connections.append(store._connection())
+    threads = [threading.Thread(target=lookup) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [["fever"]] * 4
+    assert len({id(connection) for connection in connections}) == 4
+
+
+def test_forked_process_keeps_preloaded_matchers(tmp_path):
+    _, store = make_store(tmp_path)
+    store.preload()
+    assert store.stats()["matchers"] == 2
+    matcher, parent_db = store._matcher("en"), store._connection()
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            shared = (store.find_concepts("High fever.", "en") == ["fever"] and store._matcher("en") is matcher
+                      and store._connection() is not parent_db and store.reloads == 0)
+            os.write(write_end, b"1" if shared else b"0")
+        finally:
+            os._exit(0)
+    os.close(write_end)
+    result = os.read(read_end, 1)
+    os.waitpid(pid, 0)
+    assert result == b"1"
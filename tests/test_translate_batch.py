@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+import pytest
+
+CODES = ["en", "es", "hi"]
+
+
+@pytest.fixture
+def client(app_module, monkeypatch):
+    installed = [SimpleNamespace(code=code, name=code.upper()) for code in CODES]
+    monkeypatch.setattr(app_module.translator_registry, "_installed_languages", lambda: installed)
+    return app_module.app.test_client()
+
+
+@pytest.mark.parametrize("target_langs", [["es", "xx"], ["es", 5], [None], [["es"]]])
+def test_unsupported_target_langs_are_rejected(client, target_langs):
+    response = client.post("/api/translate-batch", json={"texts": ["Fever since Monday."], "target_langs": target_langs})
+    assert response.status_code == 400
+    assert "Unsupported language codes" in response.get_json()["error"]
+
+
+def test_unsupported_source_lang_is_rejected(client):
+    response = client.post("/api/translate-batch", json={"texts": ["Fever."], "source_lang": "zz", "target_langs": ["es"]})
+    assert response.status_code == 400
+
+
+def test_missing_languages_are_reported_as_unavailable(client, app_module, monkeypatch):
+    def unavailable():
+        raise ImportError("No module named 'argostranslate'")
+    monkeypatch.setattr(app_module.translator_registry, "_installed_languages", unavailable)
+    response = client.post("/api/translate-batch", json={"texts": ["Fever."], "target_langs": ["es"]})
+    assert response.status_code == 503
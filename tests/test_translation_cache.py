@@ -0,0 +1,27 @@
+import translation_cache
+from translation_cache import TranslationCache
+
+
+def test_expired_entries_are_not_served(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(translation_cache.time, "time", lambda: now[0])
+    cache = TranslationCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+    cache.put("Patient Ana Ruiz has fever.", "en", "es", "La paciente Ana Ruiz tiene fiebre.")
+    assert cache.get("Patient Ana Ruiz has fever.", "en", "es") == "La paciente Ana Ruiz tiene fiebre."
+
+    now[0] += 61
+    # Neither the memory tier nor a fresh process's disk tier serves it.
+    assert cache.get("Patient Ana Ruiz has fever.", "en", "es") is None
+    assert TranslationCache(str(tmp_path / "cache.sqlite3"), ttl=60).stats()["disk_entries"] == 0
+
+
+def test_disk_tier_keeps_the_newest_entries(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(translation_cache.time, "time", lambda: now[0])
+    cache = TranslationCache(str(tmp_path / "cache.sqlite3"), max_disk_entries=2)
+    for i in range(4):
+        now[0] += 1
+        cache.put(f"text {i}", "en", "es", f"texto {i}")
+    assert cache.purge() == 2
+    rows = cache._db.execute("SELECT translated_text FROM translations ORDER BY created_at").fetchall()
+    assert [row[0] for row in rows] == ["texto 2", "texto 3"]
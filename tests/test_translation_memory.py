@@ -0,0 +1,51 @@
+from translation_memory import TranslationMemory
+
+
+def recording_translator():
+    calls = []
+
+    def translate(segments, source_lang, target_lang):
+        calls.append(list(segments))
+        return [f"<{segment}>" for segment in segments]
+    return translate, calls
+
+
+def test_misses_go_to_the_model_in_one_call(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "tm.sqlite3"))
+    translate, calls = recording_translator()
+    text = "Take the tablets daily. Rest at home.\nCall the clinic if it worsens."
+    assert memory.translate(text, "en", "es", translate) == (
+        "<Take the tablets daily.> <Rest at home.>\n<Call the clinic if it worsens.>")
+    assert calls == [["Take the tablets daily.", "Rest at home.", "Call the clinic if it worsens."]]
+
+    # Only the new sentence reaches the model; the others come from memory.
+    memory.translate("Rest at home. Drink water.", "en", "es", translate)
+    assert calls[1:] == [["Drink water."]]
+
+
+def test_expired_entries_are_not_reused_and_are_purged(tmp_path, monkeypatch):
+    import translation_memory
+    now = [1000.0]
+    monkeypatch.setattr(translation_memory.time, "time", lambda: now[0])
+    memory = TranslationMemory(str(tmp_path / "tm.sqlite3"), ttl=60)
+    translate, calls = recording_translator()
+    memory.translate("Rest at home.", "en", "es", translate)
+    now[0] += 61
+    memory.translate("Rest at home.", "en", "es", translate)
+    assert len(calls) == 2
+    assert memory.stats()["entries"] == 1
+
+    now[0] += 61
+    assert memory.purge() == 1
+    assert memory.stats()["entries"] == 0
+    assert memory._db.execute("SELECT COUNT(*) FROM lsh_bands").fetchone()[0] == 0
+
+
+def test_oldest_entries_go_beyond_max_entries(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "tm.sqlite3"), max_entries=3)
+    translate, _ = recording_translator()
+    for word in ["alpha", "beta", "gamma", "delta", "epsilon"]:
+        memory.translate(f"Say {word} twice.", "en", "es", translate)
+    assert memory.purge() == 2
+    assert [row[0] for row in memory._db.execute("SELECT template FROM segments ORDER BY created_at")] == [
+        "Say gamma twice.", "Say delta twice.", "Say epsilon twice."]
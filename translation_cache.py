@@ -0,0 +1,213 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# Expired and surplus disk entries are purged every this many stores.
+_PURGE_EVERY = 100
+
+
+def normalize_text(text):
+    """
+    Normalizes text for cache keying: NFC, unified newlines, no trailing
+    whitespace on lines and none around the whole text.
+    """
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in text.split("\n")).strip()
+
+
+def function_fingerprint(func):
+    """Hash of a function's bytecode and constants, so editing it changes the key."""
+    code = func.__code__
+    digest = hashlib.sha256(code.co_code)
+    digest.update(repr(code.co_consts).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class TranslationCache:
+    """
+    Two-tier translation cache: an in-process LRU bounded in bytes, backed by
+    a SQLite file shared by every worker on the box.
+
+    Keys combine the normalized text, the language pair and a version string
+    returned by `version_fn(source_lang, target_lang)` (model version plus
+    post-processing fingerprint), so upgrading a model invalidates its entries.
+
+    Cached texts can hold patient details, so entries are served for at most
+    `ttl` seconds, and the SQLite tier keeps only the newest
+    `max_disk_entries` (None disables either).
+    """
+
+    def __init__(self, db_path, max_memory_bytes=64 * 1024 * 1024, version_fn=None, ttl=None, max_disk_entries=None):
+        self.db_path = db_path
+        self.max_memory_bytes = max_memory_bytes
+        self.version_fn = version_fn or (lambda source_lang, target_lang: "")
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()  # key -> (translated text, created_at)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self._stored = 0
+
+        self._inherited_db = None
+        self._db = self._connect()
+        self.purge()
+
+    def _connect(self):
+        directory = os.path.dirname(self.db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(self.db_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, source_lang TEXT, target_lang TEXT, "
+            "translated_text TEXT, created_at REAL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS translations_by_age ON translations (created_at)")
+        db.commit()
+        return db
+
+    def reopen(self):
+        """
+        Opens a new connection in a forked worker: SQLite connections must not
+        be used across fork(). The inherited one is left to the parent.
+        """
+        db = self._connect()
+        with self._lock:
+            self._inherited_db, self._db = self._db, db
+
+    def _cutoff(self):
+        """Entries created before this time have expired."""
+        return time.time() - self.ttl if self.ttl else 0.0
+
+    def purge(self):
+        """Drops expired disk entries, then the oldest beyond `max_disk_entries`. Returns how many were removed."""
+        with self._lock:
+            return self._purge()
+
+    def _purge(self):
+        cutoff = self._cutoff()
+        removed = self._db.execute("DELETE FROM translations WHERE created_at < ?", (cutoff,)).rowcount
+        if self.max_disk_entries is not None:
+            removed += self._db.execute(
+                "DELETE FROM translations WHERE key IN ("
+                "SELECT key FROM translations ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,)).rowcount
+        self._db.commit()
+        self.disk_evictions += removed
+        return removed
+
+    def make_key(self, text, source_lang, target_lang):
+        version = self.version_fn(source_lang, target_lang)
+        raw = "\x1f".join([source_lang, target_lang, version, normalize_text(text)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _entry_size(key, value):
+        return len(key) + len(value.encode("utf-8"))
+
+    def _forget(self, key):
+        # Caller holds self._lock.
+        value, _ = self._memory.pop(key)
+        self._memory_bytes -= self._entry_size(key, value)
+
+    def _remember(self, key, value, created_at):
+        # Caller holds self._lock.
+        if key in self._memory:
+            self._forget(key)
+        size = self._entry_size(key, value)
+        if size > self.max_memory_bytes:
+            return
+        self._memory[key] = (value, created_at)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            old_key, (old_value, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= self._entry_size(old_key, old_value)
+            self.evictions += 1
+
+    def get(self, text, source_lang, target_lang):
+        key = self.make_key(text, source_lang, target_lang)
+        cutoff = self._cutoff()
+        with self._lock:
+            if key in self._memory:
+                value, created_at = self._memory[key]
+                if created_at >= cutoff:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._forget(key)
+            row = self._db.execute(
+                "SELECT translated_text, created_at FROM translations WHERE key = ? AND created_at >= ?", (key, cutoff)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, row[0], row[1])
+            return row[0]
+
+    def put(self, text, source_lang, target_lang, translated_text):
+        key = self.make_key(text, source_lang, target_lang)
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, translated_text, created_at)
+            self._db.execute(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)",
+                (key, source_lang, target_lang, translated_text, created_at),
+            )
+            self._db.commit()
+            self._stored += 1
+            if self._stored >= _PURGE_EVERY:
+                self._stored = 0
+                self._purge()
+
+    def get_or_translate(self, text, source_lang, target_lang, translate_fn):
+        """Returns the cached translation, or runs translate_fn and stores its result."""
+        cached = self.get(text, source_lang, target_lang)
+        if cached is not None:
+            return cached
+        translated_text = translate_fn(text, source_lang, target_lang)
+        self.put(text, source_lang, target_lang, translated_text)
+        return translated_text
+
+    def warm_from_file(self, phrases_path, pairs, translate_fn):
+        """
+        Pre-translates every non-empty line of phrases_path for each
+        (source_lang, target_lang) pair. Returns the number of new entries.
+        """
+        added = 0
+        with open(phrases_path, "r", encoding="utf-8") as f:
+            phrases = [line.strip() for line in f if line.strip()]
+        for source_lang, target_lang in pairs:
+            for phrase in phrases:
+                if self.get(phrase, source_lang, target_lang) is None:
+                    self.put(phrase, source_lang, target_lang, translate_fn(phrase, source_lang, target_lang))
+                    added += 1
+        return added
+
+    def stats(self):
+        with self._lock:
+            disk_entries = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "disk_entries": disk_entries,
+                "disk_evictions": self.disk_evictions,
+            }
@@ -0,0 +1,385 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from difflib import SequenceMatcher
+
+from document_pipeline import segment_document
+from translation_cache import normalize_text
+
+_DATE_RE = re.compile(r"(?<![\w/.-])(?:\d{4}-\d{1,2}-\d{1,2}|\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4})(?![\w/-])")
+_NUMBER_RE = re.compile(r"(?<![\w.,])\d+(?:[.,]\d+)*(?!\w)")
+_PLACEHOLDER_RE = re.compile(r"⟦[DNT]\d+⟧")
+_TOKEN_RE = re.compile(r"⟦[DNT]\d+⟧|\w+|[^\w\s]")
+
+# MinHash over word bigrams: 32 permutations in 8 bands of 4 rows, so templates
+# with a bigram Jaccard similarity around 0.6 or more share a band.
+_PERMUTATIONS = 32
+_BANDS = 8
+# Expired and surplus entries are purged every this many stored sentences.
+_PURGE_EVERY = 100
+_PRIME = (1 << 61) - 1
+_HASH_PARAMS = [
+    (int.from_bytes(hashlib.sha256(f"a{i}".encode()).digest()[:8], "big") % (_PRIME - 1) + 1,
+     int.from_bytes(hashlib.sha256(f"b{i}".encode()).digest()[:8], "big") % _PRIME)
+    for i in range(_PERMUTATIONS)
+]
+
+
+def _tokens(template):
+    return _TOKEN_RE.findall(template)
+
+
+def _shingles(tokens):
+    words = [token.lower() for token in tokens]
+    return set(zip(words, words[1:])) if len(words) > 1 else {tuple(words)}
+
+
+def _minhash(shingles):
+    hashes = [int.from_bytes(hashlib.blake2b("\x1f".join(shingle).encode("utf-8"), digest_size=8).digest(), "big")
+              for shingle in shingles]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _HASH_PARAMS]
+
+
+def _is_name(token):
+    """Drug and other proper names: capitalized words, which models usually copy verbatim."""
+    return len(token) >= 3 and token[:1].isupper() and token.isalnum()
+
+
+def _find_once(text, value, kind):
+    """Span of the only whole-word occurrence of value in text, or None."""
+    if kind == "T":
+        pattern = rf"(?<!\w){re.escape(value)}(?!\w)"
+    else:
+        pattern = rf"(?<![\w.,]){re.escape(value)}(?!\w)"
+    matches = list(re.finditer(pattern, text))
+    return matches[0].span() if len(matches) == 1 else None
+
+
+def _replace_spans(text, spans):
+    """Replaces non-overlapping (start, end, replacement) spans; None if any overlap."""
+    pieces = []
+    position = 0
+    for start, end, replacement in sorted(spans):
+        if start < position:
+            return None
+        pieces.append(text[position:start])
+        pieces.append(replacement)
+        position = end
+    pieces.append(text[position:])
+    return "".join(pieces)
+
+
+class TranslationMemory:
+    """
+    Segment-level translation memory in SQLite. Texts are split into
+    sentences, and each translated sentence is stored as a template: its
+    numbers, dates and glossary terms are masked as placeholders in the
+    source and in the translation. A sentence that differs from a stored one
+    only in those values reuses its translation with the new values, and the
+    glossary's term for each new concept, filled in.
+
+    Near-duplicates are found through a MinHash/LSH index over the
+    templates' word bigrams. One is reused only when the sentences differ in
+    at most `max_substitutions` name-like words (e.g. drug names) that the
+    stored translation copied verbatim; any other difference could change
+    the meaning, so the sentence goes to the model. Only model output is
+    stored. Entries are keyed by language pair and `version_fn(source_lang,
+    target_lang)`, so a new model starts a fresh memory.
+
+    Stored sentences can hold patient details that are not masked, such as
+    names, so entries are kept for at most `ttl` seconds and the oldest go
+    first once there are more than `max_entries` (None disables either).
+    """
+
+    def __init__(self, db_path, version_fn=None, terminology=None, fuzzy=True, max_substitutions=2, min_similarity=0.6,
+                 ttl=None, max_entries=None):
+        self.db_path = db_path
+        self.version_fn = version_fn or (lambda source_lang, target_lang: "")
+        self.terminology = terminology
+        self.fuzzy = fuzzy
+        self.max_substitutions = max_substitutions
+        self.min_similarity = min_similarity
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.segments = 0
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._stored = 0
+        self._inherited_db = None
+        self._db = self._connect()
+        self.purge()
+
+    def _connect(self):
+        directory = os.path.dirname(self.db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(self.db_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            "key TEXT PRIMARY KEY, scope TEXT, template TEXT, target_template TEXT, created_at REAL)"
+        )
+        db.execute("CREATE TABLE IF NOT EXISTS lsh_bands (band_key TEXT, key TEXT)")
+        db.execute("CREATE INDEX IF NOT EXISTS lsh_by_band ON lsh_bands (band_key)")
+        db.execute("CREATE INDEX IF NOT EXISTS lsh_by_key ON lsh_bands (key)")
+        db.execute("CREATE INDEX IF NOT EXISTS segments_by_age ON segments (created_at)")
+        db.commit()
+        return db
+
+    def reopen(self):
+        """Opens a new connection in a forked worker; the inherited one is left to the parent."""
+        db = self._connect()
+        with self._lock:
+            self._inherited_db, self._db = self._db, db
+
+    def _cutoff(self):
+        """Entries created before this time have expired."""
+        return time.time() - self.ttl if self.ttl else 0.0
+
+    def purge(self):
+        """Drops expired entries, then the oldest beyond `max_entries`. Returns how many were removed."""
+        with self._lock:
+            return self._purge()
+
+    def _purge(self):
+        cutoff = self._cutoff()
+        keys = [row[0] for row in self._db.execute("SELECT key FROM segments WHERE created_at < ?", (cutoff,))]
+        if self.max_entries is not None:
+            keys += [row[0] for row in self._db.execute(
+                "SELECT key FROM segments WHERE created_at >= ? ORDER BY created_at DESC LIMIT -1 OFFSET ?",
+                (cutoff, self.max_entries))]
+        self._db.executemany("DELETE FROM segments WHERE key = ?", [(key,) for key in keys])
+        self._db.executemany("DELETE FROM lsh_bands WHERE key = ?", [(key,) for key in keys])
+        self._db.commit()
+        self.evictions += len(keys)
+        return len(keys)
+
+    def _scope(self, source_lang, target_lang):
+        return "\x1f".join([source_lang, target_lang, self.version_fn(source_lang, target_lang)])
+
+    @staticmethod
+    def _key(scope, template):
+        return hashlib.sha256(f"{scope}\x1f{normalize_text(template)}".encode("utf-8")).hexdigest()
+
+    def _band_keys(self, scope, template):
+        signature = _minhash(_shingles(_tokens(template)))
+        rows = _PERMUTATIONS // _BANDS
+        return [f"{scope}\x1f{band}\x1f" + hashlib.sha256(repr(signature[band * rows:(band + 1) * rows]).encode()).hexdigest()[:16]
+                for band in range(_BANDS)]
+
+    def mask(self, segment, source_lang):
+        """
+        Returns (template, slots): the segment with dates, numbers and
+        glossary terms replaced by placeholders such as ⟦N0⟧, and
+        (placeholder, kind, value) for each, where the value of a glossary
+        term is its english concept. The number 1 is kept, since it decides
+        singular or plural wording.
+        """
+        spans = []
+
+        def add(start, end, kind, value):
+            if all(end <= other_start or start >= other_end for other_start, other_end, _, _ in spans):
+                spans.append((start, end, kind, value))
+
+        for match in _DATE_RE.finditer(segment):
+            add(match.start(), match.end(), "D", match.group(0))
+        for match in _NUMBER_RE.finditer(segment):
+            if match.group(0) != "1":
+                add(match.start(), match.end(), "N", match.group(0))
+        if self.terminology is not None:
+            concepts = self.terminology.find_concepts(segment, source_lang)
+            if concepts:
+                for english, surface in self.terminology.locate_terms(segment, source_lang, concepts).items():
+                    match = re.search(rf"(?<!\w){re.escape(surface)}(?!\w)", segment)
+                    if match:
+                        add(match.start(), match.end(), "T", english)
+        counts = {}
+        slots = []
+        replacements = []
+        for start, end, kind, value in sorted(spans):
+            placeholder = f"⟦{kind}{counts.get(kind, 0)}⟧"
+            counts[kind] = counts.get(kind, 0) + 1
+            slots.append((placeholder, kind, value))
+            replacements.append((start, end, placeholder))
+        return _replace_spans(segment, replacements), slots
+
+    def _target_template(self, translated, slots, target_lang):
+        """The translation with each slot's value masked, or None unless every value occurs exactly once."""
+        concepts = [value for _, kind, value in slots if kind == "T"]
+        located = self.terminology.locate_terms(translated, target_lang, concepts) if concepts else {}
+        replacements = []
+        for placeholder, kind, value in slots:
+            surface = located.get(value) if kind == "T" else value
+            span = _find_once(translated, surface, kind) if surface else None
+            if span is None:
+                return None
+            replacements.append((span[0], span[1], placeholder))
+        return _replace_spans(translated, replacements)
+
+    def _fill(self, target_template, slots, target_lang):
+        values = {}
+        for placeholder, kind, value in slots:
+            if kind == "T":
+                terms = self.terminology.terms(value, target_lang) if self.terminology is not None else []
+                if not terms:
+                    return None
+                values[placeholder] = terms[0]
+            else:
+                values[placeholder] = value
+        if sorted(_PLACEHOLDER_RE.findall(target_template)) != sorted(values):
+            return None
+        return _PLACEHOLDER_RE.sub(lambda match: values[match.group(0)], target_template)
+
+    def _substitute_names(self, tokens, candidate_template, candidate_target):
+        """
+        The candidate's translation adapted to a template that differs from
+        the candidate's only in name-like words which the translation copied
+        verbatim, or None.
+        """
+        candidate_tokens = _tokens(candidate_template)
+        replacements = []
+        for tag, i1, i2, j1, j2 in SequenceMatcher(None, candidate_tokens, tokens, autojunk=False).get_opcodes():
+            if tag == "equal":
+                continue
+            if tag != "replace" or i2 - i1 != j2 - j1:
+                return None
+            for i, j in zip(range(i1, i2), range(j1, j2)):
+                old, new = candidate_tokens[i], tokens[j]
+                # A capitalized first word is not necessarily a name.
+                if i == 0 or j == 0 or not (_is_name(old) and _is_name(new)):
+                    return None
+                replacements.append((old, new))
+        if len(replacements) > self.max_substitutions:
+            return None
+        spans = []
+        for old, new in replacements:
+            if _find_once(candidate_template, old, "T") is None:
+                return None
+            span = _find_once(candidate_target, old, "T")
+            if span is None:
+                return None
+            spans.append((span[0], span[1], new))
+        return _replace_spans(candidate_target, spans)
+
+    def _near_match(self, scope, template):
+        band_keys = self._band_keys(scope, template)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT DISTINCT s.template, s.target_template FROM lsh_bands b JOIN segments s ON s.key = b.key "
+                f"WHERE b.band_key IN ({','.join('?' * len(band_keys))}) AND s.created_at >= ? LIMIT 50",
+                band_keys + [self._cutoff()],
+            ).fetchall()
+        tokens = _tokens(template)
+        shingles = _shingles(tokens)
+        best = None
+        for candidate_template, candidate_target in rows:
+            candidate_shingles = _shingles(_tokens(candidate_template))
+            similarity = len(shingles & candidate_shingles) / len(shingles | candidate_shingles)
+            if similarity < self.min_similarity or (best is not None and similarity <= best[0]):
+                continue
+            target_template = self._substitute_names(tokens, candidate_template, candidate_target)
+            if target_template is not None:
+                best = (similarity, target_template)
+        return best[1] if best else None
+
+    def lookup(self, segment, source_lang, target_lang):
+        """The reused translation of one sentence, or None."""
+        scope = self._scope(source_lang, target_lang)
+        template, slots = self.mask(segment, source_lang)
+        keys = [self._key(scope, template)] + ([self._key(scope, segment)] if slots else [])
+        cutoff = self._cutoff()
+        with self._lock:
+            rows = [self._db.execute("SELECT target_template FROM segments WHERE key = ? AND created_at >= ?", (key, cutoff)).fetchone()
+                    for key in keys]
+        if rows[0] is not None:
+            translated = self._fill(rows[0][0], slots, target_lang)
+            if translated is not None:
+                return translated, "exact"
+        if len(rows) > 1 and rows[1] is not None:
+            return rows[1][0], "exact"
+        if self.fuzzy:
+            target_template = self._near_match(scope, template)
+            if target_template is not None:
+                translated = self._fill(target_template, slots, target_lang)
+                if translated is not None:
+                    return translated, "near"
+        return None
+
+    def add(self, segment, source_lang, target_lang, translated):
+        """
+        Stores a model translation of one sentence as a template, or as-is
+        when its values cannot be located in the translation.
+        """
+        if "⟦" in segment or "⟦" in translated:
+            return
+        scope = self._scope(source_lang, target_lang)
+        template, slots = self.mask(segment, source_lang)
+        target_template = self._target_template(translated, slots, target_lang) if slots else translated
+        if target_template is None:
+            template, target_template = segment, translated
+        key = self._key(scope, template)
+        band_keys = self._band_keys(scope, template)
+        with self._lock:
+            # An expired entry with the same key is replaced rather than kept.
+            if self._db.execute("DELETE FROM segments WHERE key = ? AND created_at < ?", (key, self._cutoff())).rowcount:
+                self._db.execute("DELETE FROM lsh_bands WHERE key = ?", (key,))
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO segments VALUES (?, ?, ?, ?, ?)", (key, scope, template, target_template, time.time())
+            )
+            if cursor.rowcount:
+                self._db.executemany("INSERT INTO lsh_bands VALUES (?, ?)", [(band_key, key) for band_key in band_keys])
+                self._stored += 1
+            self._db.commit()
+            if self._stored >= _PURGE_EVERY:
+                self._stored = 0
+                self._purge()
+
+    def translate(self, text, source_lang, target_lang, translate_fn):
+        """
+        Translates text sentence by sentence, reusing stored translations and
+        sending all the misses to translate_fn(segments, source_lang,
+        target_lang) -> translations in one call. Line breaks, spacing and
+        bare values pass through.
+        """
+        pieces = segment_document(text)
+        segments = list(dict.fromkeys(piece for piece, translatable in pieces if translatable))
+        translations = {}
+        misses = []
+        for segment in segments:
+            reused = None if "⟦" in segment else self.lookup(segment, source_lang, target_lang)
+            with self._lock:
+                self.segments += 1
+                if reused is None:
+                    self.misses += 1
+                elif reused[1] == "exact":
+                    self.exact_hits += 1
+                else:
+                    self.near_hits += 1
+            if reused is None:
+                misses.append(segment)
+            else:
+                translations[segment] = reused[0]
+        if misses:
+            for segment, translated in zip(misses, translate_fn(misses, source_lang, target_lang)):
+                self.add(segment, source_lang, target_lang, translated)
+                translations[segment] = translated
+        return "".join(translations[piece] if translatable else piece for piece, translatable in pieces)
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+            return {
+                "segments": self.segments,
+                "exact_hits": self.exact_hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "reuse_rate": round((self.exact_hits + self.near_hits) / self.segments, 4) if self.segments else 0.0,
+                "entries": entries,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,183 @@
+import itertools
+import os
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FuturesTimeout
+
+
+# Lower runs first: queued interactive requests overtake queued batch segments.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+
+class RegistrySaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class TranslationTimeout(Exception):
+    """Raised when a translation does not finish within the configured timeout."""
+
+
+class TranslatorRegistry:
+    """
+    Resolves the Argos translation object of each language pair (including
+    English-pivot pairs such as hi->es) on first use and keeps it warm, and
+    runs translations on a fixed-size worker pool with a bounded queue so
+    concurrent requests cannot oversubscribe the CPU.
+
+    The queue is ordered by priority. Batch work (documents, background jobs)
+    has its own slot budget of one per worker, so it can never fill the queue
+    and starve interactive requests.
+    """
+
+    def __init__(self, workers, queue_size, timeout):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._pid = None  # process whose worker threads are running
+        self._lock = threading.Lock()
+        self._installed = None  # argostranslate Language objects, loaded on first use
+        self._translations = {}  # (from_code, to_code) -> ITranslation, warm
+        self._pair_locks = {}
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _ensure_workers(self):
+        """
+        Starts the worker pool on first use in each process. A forked child
+        inherits no threads, and models loaded before the fork cannot be used
+        in it (CTranslate2 runs them on threads of its own), so it starts
+        afresh.
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._translations:
+                self._translations = {}
+                self._pair_locks = {}
+                self._installed = None
+            self._queue = queue.PriorityQueue()
+            # One slot per running or queued translation.
+            self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+            self._batch_slots = threading.BoundedSemaphore(self.workers)
+            for i in range(self.workers):
+                threading.Thread(target=self._worker, args=(self._queue,), name=f"translator-{i}", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _installed_languages(self):
+        with self._lock:
+            if self._installed is None:
+                # Importing argostranslate pulls in CTranslate2 and friends; only pay for it when needed.
+                import argostranslate.translate
+                self._installed = argostranslate.translate.get_installed_languages()
+            return self._installed
+
+    def languages(self):
+        return [{"name": lang.name, "code": lang.code} for lang in self._installed_languages()]
+
+    def codes(self):
+        return [lang.code for lang in self._installed_languages()]
+
+    def pairs(self):
+        codes = self.codes()
+        return [(from_code, to_code) for from_code in codes for to_code in codes if from_code != to_code]
+
+    def warm_pairs(self):
+        return sorted(self._translations)
+
+    def get(self, from_code, to_code):
+        """
+        Returns the warm translation for a pair. The first call for a pair
+        resolves it and loads its model with a tiny translation; concurrent
+        first callers wait for that instead of loading the model twice.
+        """
+        self._ensure_workers()
+        translation = self._translations.get((from_code, to_code))
+        if translation is not None:
+            return translation
+        with self._lock:
+            pair_lock = self._pair_locks.setdefault((from_code, to_code), threading.Lock())
+        with pair_lock:
+            translation = self._translations.get((from_code, to_code))
+            if translation is not None:
+                return translation
+            languages = {lang.code: lang for lang in self._installed_languages()}
+            if from_code not in languages or to_code not in languages:
+                raise ValueError(f"No installed translation from '{from_code}' to '{to_code}'.")
+            translation = languages[from_code].get_translation(languages[to_code])
+            if translation is None:
+                raise ValueError(f"No installed translation from '{from_code}' to '{to_code}'.")
+            print(f"Loading translation model {from_code}->{to_code}...")
+            translation.translate("ok")
+            self._translations[(from_code, to_code)] = translation
+            return translation
+
+    def preload(self, pairs):
+        """Warms the given (from_code, to_code) pairs, e.g. from a startup thread."""
+        for from_code, to_code in pairs:
+            try:
+                self.get(from_code, to_code)
+            except Exception as e:
+                print(f"Could not warm translator {from_code}->{to_code}: {e}")
+
+    def _worker(self, work_queue):
+        while True:
+            _, _, future, func, arg = work_queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(arg))
+            except Exception as e:
+                future.set_exception(e)
+
+    def translate(self, text, from_code, to_code, block=False):
+        """
+        Translates text on the worker pool. Interactive callers fail fast with
+        RegistrySaturated when the queue is full; batch callers pass block=True
+        to wait for a batch slot (up to the timeout) and run at lower priority.
+        """
+        return self._run(self.get(from_code, to_code).translate, text, block)
+
+    def translate_many(self, texts, from_code, to_code, block=False):
+        """
+        Translates several texts as one task on one worker, returning their
+        translations in order: one slot, one queue wait and one timeout for
+        the lot instead of one per text.
+        """
+        translation = self.get(from_code, to_code)
+        return self._run(lambda texts: [translation.translate(text) for text in texts], list(texts), block)
+
+    def _run(self, func, arg, block):
+        if block:
+            slots, priority = self._batch_slots, PRIORITY_BATCH
+            acquired = slots.acquire(timeout=self.timeout)
+        else:
+            slots, priority = self._slots, PRIORITY_INTERACTIVE
+            acquired = slots.acquire(blocking=False)
+        if not acquired:
+            self.rejected += 1
+            raise RegistrySaturated("Translation service is busy, please retry shortly.")
+        future = Future()
+        future.add_done_callback(lambda _: slots.release())
+        self._queue.put((priority, next(self._sequence), future, func, arg))
+        try:
+            return future.result(timeout=self.timeout)
+        except FuturesTimeout:
+            # A queued job is dropped; a running one finishes and frees its slot.
+            future.cancel()
+            self.timed_out += 1
+            raise TranslationTimeout(f"Translation did not finish within {self.timeout} seconds.")
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queued": self._queue.qsize(),
+            "warm_pairs": len(self._translations),
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
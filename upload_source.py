@@ -0,0 +1,74 @@
+import io
+import os
+import tempfile
+
+from flask import Request
+
+
+class UploadRequest(Request):
+    """
+    Keeps uploaded files in memory unless the request body is larger than
+    `spill_threshold`, in which case they go to a named temporary file that
+    is removed when the request closes. The maximum upload size is enforced by
+    Flask's MAX_CONTENT_LENGTH while the body is read.
+    """
+
+    spill_threshold = 8 * 1024 * 1024
+    spill_dir = None
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if total_content_length is not None and total_content_length <= self.spill_threshold:
+            return io.BytesIO()
+        return tempfile.NamedTemporaryFile(dir=self.spill_dir, prefix="upload-")
+
+
+class UploadSource:
+    """
+    An uploaded file as seen by the extraction code: a filename plus either a
+    readable binary stream (in memory or spilled) or a path on disk.
+    """
+
+    def __init__(self, filename, stream=None, path=None):
+        self.filename = filename
+        self._stream = stream
+        self.path = path
+        if path is None and isinstance(getattr(stream, "name", None), str):
+            # Spilled uploads live in a named temporary file.
+            self.path = stream.name
+
+    @classmethod
+    def from_file_storage(cls, file_storage):
+        return cls(file_storage.filename, stream=file_storage.stream)
+
+    @classmethod
+    def detach_from(cls, file_storage):
+        """
+        Takes ownership of an upload's stream so it outlives the request, for
+        responses that keep reading the file after the view returns. The
+        caller must close() the source.
+        """
+        stream = file_storage.stream
+        file_storage.stream = io.BytesIO()
+        return cls(file_storage.filename, stream=stream)
+
+    @property
+    def extension(self):
+        return os.path.splitext(self.filename)[1]
+
+    def open(self):
+        """Returns a binary stream positioned at the start of the file."""
+        if self._stream is None:
+            self._stream = open(self.path, "rb")
+        self._stream.seek(0)
+        return self._stream
+
+    def read_bytes(self):
+        return self.open().read()
+
+    def pdf_source(self):
+        """What PyMuPDF should open: the path when there is one, else the bytes."""
+        return self.path if self.path else self.read_bytes()
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()